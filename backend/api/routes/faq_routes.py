@@ -5,6 +5,7 @@ FAQ-related API routes matching original app.py endpoints.
 from typing import Optional, List
 from datetime import datetime
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 from models import (
     FAQResponse,
     FAQCreateRequest,
@@ -22,18 +23,29 @@ from api.dependencies import get_faq_manager, get_vector_store
 router = APIRouter(tags=["FAQs"])
 
 
-@router.get("/faqs", response_model=FAQListResponse)
+# FastAPI still validates against FAQListResponse; orjson does the encoding
+@router.get("/faqs", response_model=FAQListResponse, response_class=ORJSONResponse)
 async def get_faqs(
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
     status: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     tag: Optional[str] = Query(None),
+    after_id: Optional[int] = Query(None, ge=0),
     faq_manager: FAQManager = Depends(get_faq_manager),
 ):
-    """Get all FAQs with optional filtering and pagination."""
+    """Get all FAQs with optional filtering and pagination.
+
+    While ``has_more`` is true, pass ``next_after_id`` back as ``after_id``
+    to fetch the next page.
+    """
     result = faq_manager.get_faqs(
-        limit=limit, offset=offset, status=status, category=category, tag=tag
+        limit=limit,
+        offset=offset,
+        status=status,
+        category=category,
+        tag=tag,
+        after_id=after_id,
     )
 
     return FAQListResponse(
@@ -42,6 +54,7 @@ async def get_faqs(
         limit=result["limit"],
         offset=result["offset"],
         has_more=result["has_more"],
+        next_after_id=result["next_after_id"],
     )
 
 
@@ -3,15 +3,20 @@ Configuration management for the FAQ bot.
 """
 
 import os
-from typing import Optional
-from pydantic import BaseModel
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 
-class Settings(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Settings:
     """Application settings with environment variable support."""
 
     # Database settings
     database_path: str = "faqs.db"
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_busy_timeout: int = 5000  # milliseconds
 
     # AWS/Claude settings
     aws_access_key_id: Optional[str] = None
@@ -24,12 +29,19 @@ class Settings(BaseModel):
     rag_cache_dir: str = "rag_cache"
     default_top_k: int = 5
     vector_distance_metric: str = "l2"  # "l2" or "cosine"
+    ann_threshold: int = 500  # Use an HNSW index above this many documents
+    # "none" or "sq8", for HNSW indexes only. sq8 stores 8-bit codes: a
+    # quarter of the memory, at the cost of some recall, so it is opt-in
+    vector_quantization: str = "none"
+    embed_batch_size: int = 128
+    faiss_threads: int = 0  # 0 uses every available CPU
+    embedder_threads: int = 0  # 0 keeps the torch default
 
     # API settings
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     api_reload: bool = True
-    cors_origins: list = ["*"]
+    cors_origins: List[str] = field(default_factory=lambda: ["*"])
 
     # FAQ settings
     default_faq_status: str = "public"
@@ -37,37 +49,45 @@ class Settings(BaseModel):
     max_question_length: int = 500
     max_answer_length: int = 2000
 
-    def __init__(self):
-        # Load from environment variables
-        super().__init__(
-            database_path=os.getenv("DATABASE_PATH", "faqs.db"),
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            aws_region=os.getenv("AWS_REGION", "us-east-1"),
-            claude_model=os.getenv(
-                "CLAUDE_MODEL",
-                "us.anthropic.claude-sonnet-4-20250514-v1:0",
-            ),
-            embedding_model=os.getenv(
-                "EMBEDDING_MODEL", "intfloat/multilingual-e5-small"
-            ),
-            rag_cache_dir=os.getenv("RAG_CACHE_DIR", "rag_cache"),
-            default_top_k=int(os.getenv("DEFAULT_TOP_K", "5")),
-            vector_distance_metric=os.getenv("VECTOR_DISTANCE_METRIC", "l2"),
-            api_host=os.getenv("API_HOST", "0.0.0.0"),
-            api_port=int(os.getenv("API_PORT", "8000")),
-            api_reload=os.getenv("API_RELOAD", "true").lower() == "true",
-            cors_origins=(
-                os.getenv("CORS_ORIGINS", "*").split(",")
-                if os.getenv("CORS_ORIGINS")
-                else ["*"]
-            ),
-            default_faq_status=os.getenv("DEFAULT_FAQ_STATUS", "public"),
-            default_faq_category=os.getenv("DEFAULT_FAQ_CATEGORY", "other"),
-            max_question_length=int(os.getenv("MAX_QUESTION_LENGTH", "500")),
-            max_answer_length=int(os.getenv("MAX_ANSWER_LENGTH", "2000")),
-        )
+
+def load_settings() -> Settings:
+    """Build settings from environment variables."""
+    return Settings(
+        database_path=os.getenv("DATABASE_PATH", "faqs.db"),
+        sqlite_journal_mode=os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        sqlite_synchronous=os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        sqlite_mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", "268435456")),
+        sqlite_busy_timeout=int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        aws_region=os.getenv("AWS_REGION", "us-east-1"),
+        claude_model=os.getenv(
+            "CLAUDE_MODEL",
+            "us.anthropic.claude-sonnet-4-20250514-v1:0",
+        ),
+        embedding_model=os.getenv("EMBEDDING_MODEL", "intfloat/multilingual-e5-small"),
+        rag_cache_dir=os.getenv("RAG_CACHE_DIR", "rag_cache"),
+        default_top_k=int(os.getenv("DEFAULT_TOP_K", "5")),
+        vector_distance_metric=os.getenv("VECTOR_DISTANCE_METRIC", "l2"),
+        ann_threshold=int(os.getenv("ANN_THRESHOLD", "500")),
+        vector_quantization=os.getenv("VECTOR_QUANTIZATION", "none"),
+        embed_batch_size=int(os.getenv("EMBED_BATCH_SIZE", "128")),
+        faiss_threads=int(os.getenv("FAISS_NUM_THREADS", "0")),
+        embedder_threads=int(os.getenv("EMBEDDER_NUM_THREADS", "0")),
+        api_host=os.getenv("API_HOST", "0.0.0.0"),
+        api_port=int(os.getenv("API_PORT", "8000")),
+        api_reload=os.getenv("API_RELOAD", "true").lower() == "true",
+        cors_origins=(
+            os.getenv("CORS_ORIGINS", "*").split(",")
+            if os.getenv("CORS_ORIGINS")
+            else ["*"]
+        ),
+        default_faq_status=os.getenv("DEFAULT_FAQ_STATUS", "public"),
+        default_faq_category=os.getenv("DEFAULT_FAQ_CATEGORY", "other"),
+        max_question_length=int(os.getenv("MAX_QUESTION_LENGTH", "500")),
+        max_answer_length=int(os.getenv("MAX_ANSWER_LENGTH", "2000")),
+    )
 
 
 # Global settings instance
-settings = Settings()
+settings = load_settings()
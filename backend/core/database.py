@@ -4,39 +4,212 @@ Database connection and transaction management.
 
 import sqlite3
 import threading
+import weakref
 from contextlib import contextmanager
-from typing import Generator, Optional
+from typing import Callable, Dict, Generator, Iterable, Iterator, Optional
 from .config import settings
 from .exceptions import DatabaseError
 
+# Prepared statements kept per connection (sqlite3 defaults to 128)
+_CACHED_STATEMENTS = 256
+
+# Idempotent schema, run as a single script by initialize_schema
+_SCHEMA_SQL = """
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS faqs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    status TEXT DEFAULT 'public',
+    category TEXT DEFAULT 'other',
+    tags TEXT DEFAULT '',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Composite so filtered listings ORDER BY id without a sort
+CREATE INDEX IF NOT EXISTS idx_status_id ON faqs(status, id);
+CREATE INDEX IF NOT EXISTS idx_category_id ON faqs(category, id);
+
+-- Drop superseded indexes; b-trees over long text only slow writes
+DROP INDEX IF EXISTS idx_question;
+DROP INDEX IF EXISTS idx_answer;
+DROP INDEX IF EXISTS idx_status;
+DROP INDEX IF EXISTS idx_category;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS faqs_fts USING fts5(
+    question, answer, content='faqs', content_rowid='id'
+);
+
+-- Keep the external-content FTS index in sync on every write
+CREATE TRIGGER IF NOT EXISTS faqs_ai AFTER INSERT ON faqs BEGIN
+    INSERT INTO faqs_fts(rowid, question, answer)
+    VALUES (new.id, new.question, new.answer);
+END;
+
+CREATE TRIGGER IF NOT EXISTS faqs_ad AFTER DELETE ON faqs BEGIN
+    INSERT INTO faqs_fts(faqs_fts, rowid, question, answer)
+    VALUES ('delete', old.id, old.question, old.answer);
+END;
+
+-- Status-only updates (e.g. restores after a cache rebuild) skip the index;
+-- drop first so databases with the older AFTER UPDATE trigger pick this up
+DROP TRIGGER IF EXISTS faqs_au;
+CREATE TRIGGER faqs_au AFTER UPDATE OF question, answer ON faqs
+BEGIN
+    INSERT INTO faqs_fts(faqs_fts, rowid, question, answer)
+    VALUES ('delete', old.id, old.question, old.answer);
+    INSERT INTO faqs_fts(rowid, question, answer)
+    VALUES (new.id, new.question, new.answer);
+END;
+
+-- Normalized tag table, kept in sync with the faqs.tags JSON
+CREATE TABLE IF NOT EXISTS faq_tags (
+    faq_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, faq_id)
+);
+CREATE INDEX IF NOT EXISTS idx_faq_tags_faq ON faq_tags(faq_id);
+
+CREATE TRIGGER IF NOT EXISTS faq_tags_ai AFTER INSERT ON faqs BEGIN
+    INSERT OR IGNORE INTO faq_tags(faq_id, tag)
+    SELECT new.id, value FROM json_each(
+        CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS faq_tags_ad AFTER DELETE ON faqs BEGIN
+    DELETE FROM faq_tags WHERE faq_id = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS faq_tags_au AFTER UPDATE OF tags ON faqs
+BEGIN
+    DELETE FROM faq_tags WHERE faq_id = old.id;
+    INSERT OR IGNORE INTO faq_tags(faq_id, tag)
+    SELECT new.id, value FROM json_each(
+        CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END
+    );
+END;
+
+-- Backfill tags for databases created before faq_tags existed
+INSERT OR IGNORE INTO faq_tags(faq_id, tag)
+SELECT faqs.id, json_each.value
+FROM faqs, json_each(faqs.tags)
+WHERE json_valid(faqs.tags) AND faqs.tags != '[]'
+  AND NOT EXISTS (SELECT 1 FROM faq_tags);
+
+COMMIT;
+"""
+
+
+def _close_connections(
+    connections: Dict[int, sqlite3.Connection], lock: threading.Lock
+) -> None:
+    """Close and forget every connection in ``connections``."""
+    with lock:
+        to_close = list(connections.values())
+        connections.clear()
+    for conn in to_close:
+        conn.close()
+
 
 class DatabaseManager:
     """Manages database connections and transactions."""
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        connector: Callable[..., sqlite3.Connection] = sqlite3.connect,
+    ):
         self.db_path = db_path or settings.database_path
+        self._connector = connector
         self._local = threading.local()
+        # Open connections keyed by the ident of the thread that owns them
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        # Close connections when the manager is collected or at interpreter
+        # exit, without keeping the manager itself alive until then
+        weakref.finalize(
+            self, _close_connections, self._connections, self._connections_lock
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection for the current thread."""
+        conn = self._connector(
+            self.db_path,
+            # Allow URIs such as "file:name?mode=memory&cache=shared"
+            uri=self.db_path.startswith("file:"),
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=_CACHED_STATEMENTS,
+        )
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        conn.executescript(self._pragma_script())
+
+        with self._connections_lock:
+            self._close_stale_connections()
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _is_memory(self) -> bool:
+        """Whether this manager points at an in-memory database."""
+        return self.db_path == ":memory:" or (
+            self.db_path.startswith("file:") and "mode=memory" in self.db_path
+        )
+
+    def _pragma_script(self) -> str:
+        """Build the PRAGMA statements run once on every new connection."""
+        pragmas = []
+        if not self._is_memory():
+            # Journal and mmap settings only apply to on-disk databases
+            pragmas += [
+                f"journal_mode={settings.sqlite_journal_mode}",
+                f"synchronous={settings.sqlite_synchronous}",
+                f"mmap_size={settings.sqlite_mmap_size}",
+            ]
+        pragmas += [
+            f"busy_timeout={settings.sqlite_busy_timeout}",
+            "temp_store=MEMORY",
+            "cache_size=-64000",
+        ]
+        return "".join(f"PRAGMA {pragma};" for pragma in pragmas)
+
+    def _close_stale_connections(self) -> None:
+        """Close connections owned by threads that have exited."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        # The current thread's entry is stale too if its ident was reused
+        alive.discard(threading.get_ident())
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).close()
 
     @contextmanager
     def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-        """Get a database connection with automatic cleanup."""
+        """Get this thread's cached database connection."""
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._connect()
+                self._local.conn = conn
             yield conn
         except Exception as e:
             if conn:
                 conn.rollback()
             raise DatabaseError(f"Database operation failed: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     @contextmanager
     def get_transaction(self) -> Generator[sqlite3.Connection, None, None]:
         """Get a database connection with automatic transaction handling."""
         with self.get_connection() as conn:
+            if conn.in_transaction:
+                # Join the enclosing transaction on this connection
+                yield conn
+                return
+
+            # Take the write lock up front so concurrent writers wait out
+            # busy_timeout instead of failing on a read-to-write upgrade
+            conn.execute("BEGIN IMMEDIATE")
             try:
                 yield conn
                 conn.commit()
@@ -44,6 +217,20 @@ class DatabaseManager:
                 conn.rollback()
                 raise DatabaseError(f"Transaction failed: {e}")
 
+    def close(self) -> None:
+        """Close every connection opened by this manager."""
+        _close_connections(self._connections, self._connections_lock)
+        self._local = threading.local()
+
+    def data_version(self) -> tuple:
+        """Return a token that changes once another connection commits a write.
+
+        Pairs this thread's connection with its ``PRAGMA data_version``; the
+        pragma is only comparable between calls on the same connection.
+        """
+        with self.get_connection() as conn:
+            return conn, conn.execute("PRAGMA data_version").fetchone()[0]
+
     def execute_query(self, query: str, params: tuple = ()) -> list:
         """Execute a SELECT query and return results."""
         with self.get_connection() as conn:
@@ -51,6 +238,18 @@ class DatabaseManager:
             cursor.execute(query, params)
             return cursor.fetchall()
 
+    def iter_query(
+        self, query: str, params: tuple = (), batch_size: int = 1000
+    ) -> Iterator[sqlite3.Row]:
+        """Execute a SELECT query and yield results in batches of ``batch_size``."""
+        with self.get_connection() as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
     def execute_one(self, query: str, params: tuple = ()) -> Optional[sqlite3.Row]:
         """Execute a SELECT query and return one result."""
         with self.get_connection() as conn:
@@ -72,71 +271,35 @@ class DatabaseManager:
             cursor.execute(query, params)
             return cursor.lastrowid
 
-    def initialize_schema(self):
-        """Initialize the database schema."""
+    def execute_batch(self, query: str, seq_of_params: Iterable[tuple]) -> int:
+        """Execute a write query once per parameter set in a single transaction."""
+        with self.get_transaction() as conn:
+            cursor = conn.executemany(query, seq_of_params)
+            return cursor.rowcount
+
+    def execute_returning(
+        self, query: str, params: tuple = ()
+    ) -> Optional[sqlite3.Row]:
+        """Execute an INSERT/UPDATE ... RETURNING query and return the first row."""
         with self.get_transaction() as conn:
             cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return rows[0] if rows else None
+
+    def initialize_schema(self):
+        """Initialize the database schema."""
+        with self.get_connection() as conn:
+            had_fts_triggers = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'faqs_ai'"
+            ).fetchone()
+
+            # One script, one transaction; a failure is rolled back above
+            conn.executescript(_SCHEMA_SQL)
 
-            # Create FAQs table
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS faqs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    question TEXT NOT NULL,
-                    answer TEXT NOT NULL,
-                    status TEXT DEFAULT 'public',
-                    category TEXT DEFAULT 'other',
-                    tags TEXT DEFAULT '',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            # Create indexes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_question ON faqs(question)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_answer ON faqs(answer)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON faqs(status)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_category ON faqs(category)")
-
-            # Create FTS table
-            cursor.execute(
-                """
-                CREATE VIRTUAL TABLE IF NOT EXISTS faqs_fts USING fts5(
-                    question, answer, content='faqs', content_rowid='id'
-                )
-            """
-            )
-
-            # Create triggers
-            cursor.execute(
-                """
-                CREATE TRIGGER IF NOT EXISTS faqs_ai AFTER INSERT ON faqs BEGIN
-                    INSERT INTO faqs_fts(rowid, question, answer)
-                    VALUES (new.id, new.question, new.answer);
-                END
-            """
-            )
-
-            cursor.execute(
-                """
-                CREATE TRIGGER IF NOT EXISTS faqs_ad AFTER DELETE ON faqs BEGIN
-                    INSERT INTO faqs_fts(faqs_fts, rowid, question, answer)
-                    VALUES('delete', old.id, old.question, old.answer);
-                END
-            """
-            )
-
-            cursor.execute(
-                """
-                CREATE TRIGGER IF NOT EXISTS faqs_au AFTER UPDATE ON faqs BEGIN
-                    INSERT INTO faqs_fts(faqs_fts, rowid, question, answer)
-                    VALUES('delete', old.id, old.question, old.answer);
-                    INSERT INTO faqs_fts(rowid, question, answer)
-                    VALUES (new.id, new.question, new.answer);
-                END
-            """
-            )
+            # Databases written without the FTS triggers have a stale index
+            if not had_fts_triggers:
+                conn.execute("INSERT INTO faqs_fts(faqs_fts) VALUES('rebuild')")
 
 
 # Global database manager instance
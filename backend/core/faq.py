@@ -2,22 +2,99 @@
 FAQ management with combined data access and business logic.
 """
 
-import json
-from typing import Dict, List, Optional, Any
+import itertools
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import orjson
 from datetime import datetime
 from core.database import DatabaseManager
 from core.config import settings
 from core.exceptions import ValidationError, NotFoundError, DatabaseError
 from core.pending_changes import PendingChangesManager, ChangeType
-from models import FAQResponse, FAQCreateRequest, FAQUpdateRequest
+from models import FAQResponse, FAQCreateRequest, FAQUpdateRequest, VALID_STATUSES
+
+# Fixed SQL is kept at module level so every call hits the same entry in
+# the connection's prepared-statement cache
+_FAQ_COLUMNS = "id, question, answer, status, category, tags, created_at, updated_at"
+_GET_BY_ID_QUERY = f"SELECT {_FAQ_COLUMNS} FROM faqs WHERE id = ?"
+_INSERT_QUERY = """
+    INSERT INTO faqs (question, answer, status, category, tags)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_INSERT_RETURNING_QUERY = f"{_INSERT_QUERY} RETURNING {_FAQ_COLUMNS}"
+_SELECT_AFTER_ID_QUERY = f"SELECT {_FAQ_COLUMNS} FROM faqs WHERE id > ? ORDER BY id"
+_MAX_ID_QUERY = "SELECT COALESCE(MAX(id), 0) FROM faqs"
+_DELETE_QUERY = "DELETE FROM faqs WHERE id = ?"
+_UPDATE_STATUS_QUERY = (
+    "UPDATE faqs SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+)
+# Full-text hits ranked by bm25, followed by exact category and tag matches
+# that the FTS index (question and answer only) cannot see. Every branch is
+# an index lookup; MIN keeps the bm25 score of rows matched more than once
+_SEARCH_QUERY = """
+    SELECT f.id, f.question, f.answer, f.status, f.category, f.tags,
+           f.created_at, f.updated_at, MIN(m.score) AS score
+    FROM (
+        SELECT rowid AS id, bm25(faqs_fts) AS score
+        FROM faqs_fts WHERE faqs_fts MATCH ?
+        UNION
+        SELECT id, NULL FROM faqs WHERE category = ?
+        UNION
+        SELECT faq_id, NULL FROM faq_tags WHERE tag = ?
+    ) m
+    JOIN faqs f ON f.id = m.id
+    GROUP BY f.id
+    ORDER BY score IS NULL, score, f.id
+    LIMIT ?
+"""
+
+# Conditions for the optional listing filters, in (status, category, tag) order
+_FILTER_CONDITIONS = (
+    "status = ?",
+    "category = ?",
+    # Tags are matched through the normalized faq_tags table
+    "id IN (SELECT faq_id FROM faq_tags WHERE tag = ?)",
+)
+
+
+def _build_listing_queries() -> Dict[tuple, tuple[str, str, str]]:
+    """Precompute (count, seek, list) SQL for every combination of filters."""
+    queries = {}
+    for key in itertools.product((False, True), repeat=3):
+        conditions = [cond for cond, on in zip(_FILTER_CONDITIONS, key) if on]
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        keyset = " AND ".join(conditions + ["id > ?"])
+        queries[key] = (
+            f"SELECT COUNT(*) FROM faqs{where}",
+            f"SELECT id FROM faqs{where} ORDER BY id LIMIT 1 OFFSET ?",
+            f"SELECT {_FAQ_COLUMNS} FROM faqs WHERE {keyset} ORDER BY id LIMIT ?",
+        )
+    return queries
+
+
+# Keyed by (has_status, has_category, has_tag)
+_LISTING_QUERIES = _build_listing_queries()
 
 
 class FAQManager:
     """Combined FAQ repository and service with data access and business logic."""
 
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        pending_changes: Optional[PendingChangesManager] = None,
+    ):
         self.db = db_manager
-        self.pending_changes = PendingChangesManager()
+        self.pending_changes = pending_changes or PendingChangesManager()
+
+        # Tag/category lookups cached until the next mutation, here or by any
+        # other connection (e.g. the CLI). Data versions are per connection,
+        # and connections are per thread, so the last version seen is kept
+        # for each thread; the lock guards both dicts across the threadpool
+        self._lookup_cache: Dict[str, Any] = {}
+        self._lookup_versions: Dict[int, tuple] = {}
+        self._lookup_lock = threading.Lock()
 
     # Public API Methods (Business Logic)
 
@@ -35,26 +112,41 @@ class FAQManager:
         status: Optional[str] = None,
         category: Optional[str] = None,
         tag: Optional[str] = None,
+        after_id: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """Get FAQs with pagination and filtering."""
+        """Get FAQs with pagination and filtering.
+
+        Pass ``after_id`` (the last ID of the previous page, returned as
+        ``next_after_id`` while ``has_more``) for keyset pagination;
+        ``offset`` is kept for backward compatibility.
+        """
         # Validate parameters
         if limit <= 0 or limit > 500:
             raise ValidationError("Limit must be between 1 and 500")
         if offset < 0:
             raise ValidationError("Offset cannot be negative")
 
+        # Fetch one extra row to know whether another page follows
         faqs, total_count = self._get_all(
-            limit=limit, offset=offset, status=status, category=category, tag=tag
+            limit=limit + 1,
+            offset=offset,
+            status=status,
+            category=category,
+            tag=tag,
+            after_id=after_id,
         )
 
-        has_more = (offset + len(faqs)) < total_count
+        has_more = len(faqs) > limit
+        faqs = faqs[:limit]
 
         return {
             "faqs": faqs,
             "total": total_count,
             "limit": limit,
             "offset": offset,
+            "after_id": after_id,
             "has_more": has_more,
+            "next_after_id": faqs[-1].id if has_more else None,
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -86,6 +178,40 @@ class FAQManager:
 
         return faq
 
+    def bulk_create_faqs(self, requests: List[FAQCreateRequest]) -> List[FAQResponse]:
+        """Create several FAQs in a single transaction."""
+        # Validate everything up front so a bad item writes nothing
+        for request in requests:
+            self._validate_faq_input(request.question, request.answer)
+            self._validate_status(request.status)
+            self._validate_tags(request.tags)
+
+        if not requests:
+            return []
+
+        faqs = self._bulk_create(
+            [
+                (
+                    request.question.strip(),
+                    request.answer.strip(),
+                    "pending",  # Always set to pending initially
+                    request.category,
+                    self._serialize_tags(request.tags),
+                )
+                for request in requests
+            ]
+        )
+
+        # Track all pending changes with one write of the pending file
+        self.pending_changes.add_pending_changes(
+            [
+                (faq.id, ChangeType.CREATED, request.status)
+                for faq, request in zip(faqs, requests)
+            ]
+        )
+
+        return faqs
+
     def update_faq(
         self, faq_id: int, request: FAQUpdateRequest
     ) -> tuple[FAQResponse, FAQResponse]:
@@ -187,6 +313,10 @@ class FAQManager:
 
     def load_faqs_for_rag(self) -> List[Dict[str, Any]]:
         """Load FAQ data for RAG system."""
+        return list(self._load_for_rag())
+
+    def iter_faqs_for_rag(self) -> Iterator[Dict[str, Any]]:
+        """Stream FAQ data for RAG system without materializing it."""
         return self._load_for_rag()
 
     def get_pending_changes(self) -> Dict[str, Any]:
@@ -197,17 +327,21 @@ class FAQManager:
         """Restore FAQ statuses to their intended values after cache rebuild."""
         try:
             changes = self.pending_changes.get_changes_for_rebuild()
-            restored_count = 0
-
-            for change in changes:
-                if change.change_type == ChangeType.DELETED:
-                    # Skip deleted FAQs - they're already gone
-                    continue
 
-                # Restore the FAQ status to its original/intended value
-                if change.original_status and change.original_status != "pending":
-                    self._update_status_only(change.faq_id, change.original_status)
-                    restored_count += 1
+            # Restore FAQ statuses to their original/intended values. Deleted
+            # FAQs are already gone and "pending" has nothing to restore.
+            rows = [
+                (change.original_status, change.faq_id)
+                for change in changes
+                if change.change_type != ChangeType.DELETED
+                and change.original_status
+                and change.original_status != "pending"
+            ]
+
+            # Apply all status restores as one batched statement in one transaction
+            if rows:
+                self.db.execute_batch(_UPDATE_STATUS_QUERY, rows)
+            restored_count = len(rows)
 
             # Clear all pending changes after successful restore
             clear_result = self.pending_changes.clear_all_pending_changes()
@@ -222,21 +356,11 @@ class FAQManager:
         except Exception as e:
             raise DatabaseError(f"Failed to restore FAQ statuses: {e}")
 
-    def _update_status_only(self, faq_id: int, status: str) -> None:
-        """Update only the status of an FAQ (internal method)."""
-        query = "UPDATE faqs SET status = ?, updated_at = ? WHERE id = ?"
-        params = (status, datetime.now().isoformat(), faq_id)
-        self.db.execute_query(query, params)
-
     # Private Data Access Methods (Repository Layer)
 
     def _get_by_id(self, faq_id: int) -> Optional[FAQResponse]:
         """Get FAQ by ID."""
-        query = """
-            SELECT id, question, answer, status, category, tags, created_at, updated_at
-            FROM faqs WHERE id = ?
-        """
-        row = self.db.execute_one(query, (faq_id,))
+        row = self.db.execute_one(_GET_BY_ID_QUERY, (faq_id,))
         return self._row_to_faq(row) if row else None
 
     def _get_all(
@@ -246,23 +370,30 @@ class FAQManager:
         status: Optional[str] = None,
         category: Optional[str] = None,
         tag: Optional[str] = None,
+        after_id: Optional[int] = None,
     ) -> tuple[List[FAQResponse], int]:
-        """Get all FAQs with optional filtering and pagination."""
-        filters = {"status": status, "category": category, "tag": tag}
-        where_clause, params = self._build_where_clause(filters)
+        """Get all FAQs with optional filtering and keyset pagination."""
+        filters = (status, category, tag)
+        count_query, seek_query, list_query = _LISTING_QUERIES[
+            tuple(value is not None for value in filters)
+        ]
+        params = tuple(value for value in filters if value is not None)
 
         # Get total count
-        count_query = f"SELECT COUNT(*) FROM faqs{where_clause}"
         total_count = self.db.execute_one(count_query, params)[0]
 
-        # Get FAQs with pagination
-        query = f"""
-            SELECT id, question, answer, status, category, tags, created_at, updated_at
-            FROM faqs{where_clause} ORDER BY id
-        """
-        query = self._apply_pagination(query, limit, offset)
-
-        rows = self.db.execute_query(query, params)
+        # Translate a legacy offset into the ID to resume after
+        if after_id is None and offset > 0:
+            row = self.db.execute_one(seek_query, params + (offset - 1,))
+            if row is None:
+                return [], total_count
+            after_id = row[0]
+
+        # IDs start at 1, so 0 means "from the start"; LIMIT -1 means no limit
+        rows = self.db.execute_query(
+            list_query,
+            params + (after_id or 0, limit if limit is not None else -1),
+        )
         faqs = [self._row_to_faq(row) for row in rows]
 
         return faqs, total_count
@@ -279,30 +410,35 @@ class FAQManager:
         tags = tags or []
         tags_json = self._serialize_tags(tags)
 
-        query = """
-            INSERT INTO faqs (question, answer, status, category, tags)
-            VALUES (?, ?, ?, ?, ?)
-        """
-        faq_id = self.db.execute_insert(
-            query, (question, answer, status, category, tags_json)
+        row = self.db.execute_returning(
+            _INSERT_RETURNING_QUERY, (question, answer, status, category, tags_json)
         )
+        self._invalidate_lookups()
 
         # Return the created FAQ
-        created_faq = self._get_by_id(faq_id)
-        if not created_faq:
+        if not row:
             raise DatabaseError("Failed to retrieve created FAQ")
-        return created_faq
+        return self._row_to_faq(row)
+
+    def _bulk_create(self, rows: List[tuple]) -> List[FAQResponse]:
+        """Insert prepared FAQ rows with one executemany and return them."""
+        with self.db.get_transaction() as conn:
+            # executemany discards RETURNING rows, so read back everything
+            # past the previous maximum ID. This relies on get_transaction's
+            # BEGIN IMMEDIATE: the write lock is held from the MAX(id) read
+            # on, so no other connection can insert rows in between
+            (last_id,) = conn.execute(_MAX_ID_QUERY).fetchone()
+            conn.executemany(_INSERT_QUERY, rows)
+            created = conn.execute(_SELECT_AFTER_ID_QUERY, (last_id,)).fetchall()
+        self._invalidate_lookups()
+
+        return [self._row_to_faq(row) for row in created]
 
     def _update(self, faq_id: int, **updates) -> Optional[FAQResponse]:
         """Update an existing FAQ."""
         if not updates:
             return self._get_by_id(faq_id)
 
-        # Get existing FAQ first
-        existing = self._get_by_id(faq_id)
-        if not existing:
-            raise NotFoundError(f"FAQ not found with ID: {faq_id}")
-
         # Build update query
         set_clauses = []
         params = []
@@ -315,14 +451,26 @@ class FAQManager:
                 set_clauses.append(f"{field} = ?")
                 params.append(value)
 
-        if set_clauses:
-            set_clauses.append("updated_at = CURRENT_TIMESTAMP")
-            params.append(faq_id)
+        if not set_clauses:
+            existing = self._get_by_id(faq_id)
+            if not existing:
+                raise NotFoundError(f"FAQ not found with ID: {faq_id}")
+            return existing
 
-            query = f"UPDATE faqs SET {', '.join(set_clauses)} WHERE id = ?"
-            self.db.execute_update(query, tuple(params))
+        set_clauses.append("updated_at = CURRENT_TIMESTAMP")
+        params.append(faq_id)
+
+        query = f"""
+            UPDATE faqs SET {', '.join(set_clauses)} WHERE id = ?
+            RETURNING id, question, answer, status, category, tags,
+                      created_at, updated_at
+        """
+        row = self.db.execute_returning(query, tuple(params))
+        if not row:
+            raise NotFoundError(f"FAQ not found with ID: {faq_id}")
+        self._invalidate_lookups()
 
-        return self._get_by_id(faq_id)
+        return self._row_to_faq(row)
 
     def _delete(self, faq_id: int) -> Optional[FAQResponse]:
         """Delete an FAQ and return the deleted FAQ."""
@@ -331,8 +479,8 @@ class FAQManager:
         if not faq:
             raise NotFoundError(f"FAQ not found with ID: {faq_id}")
 
-        query = "DELETE FROM faqs WHERE id = ?"
-        rows_affected = self.db.execute_update(query, (faq_id,))
+        rows_affected = self.db.execute_update(_DELETE_QUERY, (faq_id,))
+        self._invalidate_lookups()
 
         if rows_affected == 0:
             raise DatabaseError("Failed to delete FAQ")
@@ -340,6 +488,21 @@ class FAQManager:
         return faq
 
     def _search(self, query_text: str, limit: int = 20) -> List[FAQResponse]:
+        """Search FAQs using the FTS5 index, falling back to LIKE-based search."""
+        fts_query = self._build_fts_query(query_text)
+        if fts_query:
+            rows = self.db.execute_query(
+                _SEARCH_QUERY, (fts_query, query_text, query_text, limit)
+            )
+            # FTS hits sort first; without one, the LIKE ranker also covers
+            # substrings inside unsegmented (e.g. Japanese) text
+            if rows and rows[0][8] is not None:
+                return [self._row_to_faq(row) for row in rows]
+
+        # No indexable terms or no FTS hits: use the LIKE-based ranker
+        return self._search_like(query_text, limit)
+
+    def _search_like(self, query_text: str, limit: int = 20) -> List[FAQResponse]:
         """Search FAQs using LIKE-based search."""
         query = """
             SELECT * FROM (
@@ -349,21 +512,22 @@ class FAQManager:
                            WHEN question LIKE ? THEN 10.0
                            WHEN answer LIKE ? THEN 8.0
                            WHEN category LIKE ? THEN 7.0
-                           WHEN (tags != '' AND tags != '[]' AND tags LIKE ?) THEN 6.0
+                           WHEN id IN (SELECT faq_id FROM faq_tags WHERE tag = ?)
+                               THEN 6.0
                            WHEN question LIKE ? THEN 5.0
                            WHEN answer LIKE ? THEN 3.0
                            ELSE 0.0
                        END as score
                 FROM faqs
                 WHERE question LIKE ? OR answer LIKE ? OR category LIKE ?
-                   OR (tags != '' AND tags != '[]' AND tags LIKE ?)
+                   OR id IN (SELECT faq_id FROM faq_tags WHERE tag = ?)
             ) WHERE score > 0
             ORDER BY score DESC, id ASC
             LIMIT ?
         """
 
         search_term = f"%{query_text}%"
-        tag_term = f'%"{query_text}"%'
+        tag_term = query_text
 
         params = (
             search_term,
@@ -384,15 +548,11 @@ class FAQManager:
 
     def _get_all_tags(self) -> List[str]:
         """Get all unique tags from the database."""
-        query = "SELECT tags FROM faqs WHERE tags != '' AND tags != '[]'"
-        rows = self.db.execute_query(query)
-
-        all_tags = set()
-        for row in rows:
-            tags = self._parse_tags(row[0])
-            all_tags.update(tags)
-
-        return sorted(list(all_tags))
+        query = "SELECT DISTINCT tag FROM faq_tags ORDER BY tag"
+        tags = self._cached_lookup(
+            "tags", lambda: [row[0] for row in self.db.execute_query(query)]
+        )
+        return list(tags)
 
     def _get_all_categories(self) -> List[Dict[str, Any]]:
         """Get all unique categories with their counts."""
@@ -403,70 +563,77 @@ class FAQManager:
             GROUP BY category
             ORDER BY category
         """
-        rows = self.db.execute_query(query)
-        return [{"name": row[0], "count": row[1]} for row in rows]
+        categories = self._cached_lookup(
+            "categories",
+            lambda: [
+                {"name": row[0], "count": row[1]}
+                for row in self.db.execute_query(query)
+            ],
+        )
+        return [dict(category) for category in categories]
+
+    def _cached_lookup(self, key: str, load: Callable[[], Any]) -> Any:
+        """Return a cached lookup, reloading it if another connection wrote since."""
+        version = self.db.data_version()
+        thread_id = threading.get_ident()
+        with self._lookup_lock:
+            if self._lookup_versions.get(thread_id) != version:
+                self._lookup_cache.clear()
+                self._lookup_versions[thread_id] = version
+            if key not in self._lookup_cache:
+                self._lookup_cache[key] = load()
+            return self._lookup_cache[key]
+
+    def _invalidate_lookups(self) -> None:
+        """Drop cached tag/category lookups after a mutation."""
+        with self._lookup_lock:
+            self._lookup_cache.clear()
 
     def _get_statistics(self) -> Dict[str, Any]:
         """Get comprehensive FAQ statistics."""
-        stats = {}
-
-        # Basic counts
-        stats["total_faqs"] = self.db.execute_one("SELECT COUNT(*) FROM faqs")[0]
-        stats["public_faqs"] = self.db.execute_one(
-            "SELECT COUNT(*) FROM faqs WHERE status = 'public'"
-        )[0]
-        stats["private_faqs"] = self.db.execute_one(
-            "SELECT COUNT(*) FROM faqs WHERE status = 'private'"
-        )[0]
-
-        # Recent FAQs (last 7 days)
-        stats["recent_faqs"] = self.db.execute_one(
-            "SELECT COUNT(*) FROM faqs WHERE created_at >= datetime('now', '-7 days')"
-        )[0]
-
-        # Text length statistics
-        stats["avg_question_length"] = (
-            self.db.execute_one("SELECT AVG(LENGTH(question)) FROM faqs")[0] or 0
-        )
-        stats["avg_answer_length"] = (
-            self.db.execute_one("SELECT AVG(LENGTH(answer)) FROM faqs")[0] or 0
-        )
-        stats["max_question_length"] = (
-            self.db.execute_one("SELECT MAX(LENGTH(question)) FROM faqs")[0] or 0
-        )
-        stats["max_answer_length"] = (
-            self.db.execute_one("SELECT MAX(LENGTH(answer)) FROM faqs")[0] or 0
-        )
-
-        # FAQs with tags
-        stats["faqs_with_tags"] = self.db.execute_one(
-            "SELECT COUNT(*) FROM faqs WHERE tags != '' AND tags != '[]'"
-        )[0]
+        # Compute every statistic in a single pass over the table
+        query = """
+            SELECT
+                COUNT(*),
+                SUM(status = 'public'),
+                SUM(status = 'private'),
+                SUM(created_at >= datetime('now', '-7 days')),
+                AVG(LENGTH(question)),
+                AVG(LENGTH(answer)),
+                MAX(LENGTH(question)),
+                MAX(LENGTH(answer)),
+                SUM(tags != '' AND tags != '[]')
+            FROM faqs
+        """
+        row = self.db.execute_one(query)
 
-        return stats
+        # Aggregates are NULL on an empty table
+        return {
+            "total_faqs": row[0],
+            "public_faqs": row[1] or 0,
+            "private_faqs": row[2] or 0,
+            "recent_faqs": row[3] or 0,
+            "avg_question_length": row[4] or 0,
+            "avg_answer_length": row[5] or 0,
+            "max_question_length": row[6] or 0,
+            "max_answer_length": row[7] or 0,
+            "faqs_with_tags": row[8] or 0,
+        }
 
-    def _load_for_rag(self) -> List[Dict[str, Any]]:
-        """Load FAQ data for RAG system."""
+    def _load_for_rag(self) -> Iterator[Dict[str, Any]]:
+        """Load FAQ data for RAG system, one row at a time."""
         query = (
             "SELECT id, question, answer, status, category, tags FROM faqs ORDER BY id"
         )
-        params = ()
-        rows = self.db.execute_query(query, params)
-
-        faq_data = []
-        for row in rows:
-            faq_data.append(
-                {
-                    "id": row[0],
-                    "question": row[1],
-                    "answer": row[2],
-                    "status": row[3],
-                    "category": row[4],
-                    "tags": self._parse_tags(row[5]),
-                }
-            )
-
-        return faq_data
+        for row in self.db.iter_query(query):
+            yield {
+                "id": row[0],
+                "question": row[1],
+                "answer": row[2],
+                "status": row[3],
+                "category": row[4],
+                "tags": self._parse_tags(row[5]),
+            }
 
     # Validation Methods (Business Logic)
 
@@ -497,9 +664,8 @@ class FAQManager:
 
     def _validate_status(self, status: str):
         """Validate FAQ status."""
-        valid_statuses = ["public", "private", "pending"]
-        if status not in valid_statuses:
-            raise ValidationError(f"Status must be one of: {', '.join(valid_statuses)}")
+        if status not in VALID_STATUSES:
+            raise ValidationError(f"Status must be one of: {', '.join(VALID_STATUSES)}")
 
     def _validate_tags(self, tags: List[str]):
         """Validate FAQ tags."""
@@ -510,7 +676,8 @@ class FAQManager:
             raise ValidationError("Cannot have more than 10 tags")
 
         for tag in tags:
-            if not tag.strip():
+            # isspace() checks blank tags without allocating a stripped copy
+            if not tag or tag.isspace():
                 raise ValidationError("Tags cannot be empty")
             if len(tag) > 50:
                 raise ValidationError("Individual tags cannot exceed 50 characters")
@@ -519,44 +686,21 @@ class FAQManager:
 
     def _parse_tags(self, tags_json: str) -> List[str]:
         """Parse JSON tags string to list."""
-        if not tags_json or tags_json == "":
+        if not tags_json or tags_json == "[]":
             return []
         try:
-            return json.loads(tags_json)
-        except (json.JSONDecodeError, TypeError):
+            return orjson.loads(tags_json)
+        except (orjson.JSONDecodeError, TypeError):
             return []
 
     def _serialize_tags(self, tags: List[str]) -> str:
         """Serialize tags list to JSON string."""
-        return json.dumps(tags) if tags else "[]"
-
-    def _build_where_clause(self, filters: Dict[str, Any]) -> tuple[str, tuple]:
-        """Build WHERE clause from filters dictionary."""
-        conditions = []
-        params = []
+        return orjson.dumps(tags).decode() if tags else "[]"
 
-        for key, value in filters.items():
-            if value is not None:
-                if key == "tag":
-                    # Special handling for tag filtering
-                    conditions.append("(tags != '' AND tags != '[]' AND tags LIKE ?)")
-                    params.append(f'%"{value}"%')
-                else:
-                    conditions.append(f"{key} = ?")
-                    params.append(value)
-
-        where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
-        return where_clause, tuple(params)
-
-    def _apply_pagination(
-        self, query: str, limit: Optional[int] = None, offset: int = 0
-    ) -> str:
-        """Apply pagination to a query."""
-        if limit is not None:
-            query += f" LIMIT {limit}"
-            if offset > 0:
-                query += f" OFFSET {offset}"
-        return query
+    def _build_fts_query(self, query_text: str) -> str:
+        """Build an FTS5 MATCH expression with one quoted prefix term per word."""
+        terms = re.findall(r"\w+", query_text)
+        return " ".join(f'"{term}"*' for term in terms)
 
     def _row_to_faq(self, row) -> FAQResponse:
         """Convert database row to FAQResponse object."""
@@ -2,14 +2,19 @@
 Pending changes management for vector cache updates.
 """
 
-import json
 import os
-from typing import Dict, List, Optional, Any, Set
+import orjson
+from operator import attrgetter, itemgetter
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
 from enum import Enum
 from core.config import settings
 from core.exceptions import CacheError
 
+# Fold the mutation log into the JSON snapshot once it grows past this size,
+# so replaying it after another process writes stays cheap between rebuilds
+_LOG_COMPACT_BYTES = 256 * 1024
+
 
 class ChangeType(str, Enum):
     """Types of pending changes."""
@@ -60,6 +65,13 @@ class PendingChangesManager:
     def __init__(self, cache_dir: str = None):
         self.cache_dir = cache_dir or settings.rag_cache_dir
         self.pending_file = os.path.join(self.cache_dir, "pending_changes.json")
+        # Mutations are appended here and folded into pending_file on compaction
+        self.log_file = os.path.join(self.cache_dir, "pending_changes.log")
+
+        # In-memory copy of the pending changes, valid while the files on disk
+        # still match the signature recorded when it was loaded or written
+        self._cache: Optional[Dict[int, Dict[str, Any]]] = None
+        self._signature: Optional[tuple] = None
 
         # Ensure cache directory exists
         os.makedirs(self.cache_dir, exist_ok=True)
@@ -74,30 +86,45 @@ class PendingChangesManager:
         try:
             pending_changes = self._load_pending_changes()
 
-            # Remove any existing change for this FAQ (replace with new one)
-            pending_changes = {
-                faq_id_key: change
-                for faq_id_key, change in pending_changes.items()
-                if faq_id_key != str(faq_id)
-            }
-
-            # Add new change
+            # Replace any existing change for this FAQ, moving it to the end
             change = PendingChange(faq_id, change_type, original_status)
-            pending_changes[str(faq_id)] = change.to_dict()
+            pending_changes.pop(faq_id, None)
+            pending_changes[faq_id] = change.to_dict()
 
-            self._save_pending_changes(pending_changes)
+            self._append_log(
+                pending_changes, [{"op": "set", "change": change.to_dict()}]
+            )
 
         except Exception as e:
             raise CacheError(f"Failed to add pending change: {e}")
 
+    def add_pending_changes(
+        self, changes: List[Tuple[int, ChangeType, Optional[str]]]
+    ) -> None:
+        """Add several pending changes with a single append to the log."""
+        try:
+            pending_changes = self._load_pending_changes()
+
+            records = []
+            for faq_id, change_type, original_status in changes:
+                change = PendingChange(faq_id, change_type, original_status)
+                pending_changes.pop(faq_id, None)
+                pending_changes[faq_id] = change.to_dict()
+                records.append({"op": "set", "change": change.to_dict()})
+
+            self._append_log(pending_changes, records)
+
+        except Exception as e:
+            raise CacheError(f"Failed to add pending changes: {e}")
+
     def remove_pending_change(self, faq_id: int) -> bool:
         """Remove a pending change. Returns True if change was found and removed."""
         try:
             pending_changes = self._load_pending_changes()
 
-            if str(faq_id) in pending_changes:
-                del pending_changes[str(faq_id)]
-                self._save_pending_changes(pending_changes)
+            if faq_id in pending_changes:
+                del pending_changes[faq_id]
+                self._append_log(pending_changes, [{"op": "del", "faq_id": faq_id}])
                 return True
 
             return False
@@ -114,7 +141,7 @@ class PendingChangesManager:
             changes = []
             stats = {"created": 0, "updated": 0, "deleted": 0}
 
-            for faq_id_str, change_data in pending_changes.items():
+            for change_data in pending_changes.values():
                 change = PendingChange.from_dict(change_data)
                 changes.append(
                     {
@@ -126,8 +153,9 @@ class PendingChangesManager:
                 )
                 stats[change.change_type] += 1
 
-            # Sort by timestamp (newest first)
-            changes.sort(key=lambda x: x["timestamp"], reverse=True)
+            # Sort by timestamp (newest first); insertion order is already
+            # chronological, so this is a single linear pass in practice
+            changes.sort(key=itemgetter("timestamp"), reverse=True)
 
             return {
                 "changes": changes,
@@ -144,7 +172,7 @@ class PendingChangesManager:
         """Get set of FAQ IDs that have pending changes."""
         try:
             pending_changes = self._load_pending_changes()
-            return {int(faq_id) for faq_id in pending_changes.keys()}
+            return set(pending_changes)
         except Exception as e:
             raise CacheError(f"Failed to get pending FAQ IDs: {e}")
 
@@ -167,43 +195,123 @@ class PendingChangesManager:
         try:
             pending_changes = self._load_pending_changes()
 
-            changes = []
-            for change_data in pending_changes.values():
-                changes.append(PendingChange.from_dict(change_data))
+            # Fold the mutation log into the snapshot before processing
+            if os.path.exists(self.log_file):
+                self._save_pending_changes(pending_changes)
 
             # Sort by timestamp (oldest first for processing)
-            changes.sort(key=lambda x: x.timestamp)
-
-            return changes
+            return sorted(
+                map(PendingChange.from_dict, pending_changes.values()),
+                key=attrgetter("timestamp"),
+            )
 
         except Exception as e:
             raise CacheError(f"Failed to get changes for rebuild: {e}")
 
-    def _load_pending_changes(self) -> Dict[str, Dict[str, Any]]:
-        """Load pending changes from JSON file."""
-        if not os.path.exists(self.pending_file):
-            return {}
-
+    def _load_pending_changes(self) -> Dict[int, Dict[str, Any]]:
+        """Load pending changes, reading the files only if they changed on disk."""
+        signature = self._file_signature()
+        if self._cache is None or signature != self._signature:
+            self._cache = self._read_pending_changes()
+            self._signature = signature
+        return self._cache
+
+    def _read_pending_changes(self) -> Dict[int, Dict[str, Any]]:
+        """Read the JSON snapshot and replay the mutation log on top of it."""
+        changes = {}
+        if os.path.exists(self.pending_file):
+            try:
+                with open(self.pending_file, "rb") as f:
+                    # JSON object keys are strings; keep FAQ IDs as ints in memory
+                    changes = {
+                        int(faq_id): change
+                        for faq_id, change in orjson.loads(f.read()).items()
+                    }
+            except (orjson.JSONDecodeError, IOError) as e:
+                # If file is corrupted, start fresh
+                print(f"Warning: Corrupted pending changes file, starting fresh: {e}")
+
+        if os.path.exists(self.log_file):
+            try:
+                with open(self.log_file, "rb") as f:
+                    lines = f.read().splitlines()
+            except IOError as e:
+                print(f"Warning: Could not read pending changes log: {e}")
+                lines = []
+
+            for line in lines:
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # Skip a torn trailing write
+                    continue
+                if record["op"] == "set":
+                    change = record["change"]
+                    # Re-insert so the dict stays in the order changes were made
+                    changes.pop(change["faq_id"], None)
+                    changes[change["faq_id"]] = change
+                else:
+                    changes.pop(record["faq_id"], None)
+
+        return changes
+
+    def _append_log(
+        self, changes: Dict[int, Dict[str, Any]], records: List[Dict[str, Any]]
+    ) -> None:
+        """Append mutation records to the log and keep ``changes`` in memory."""
+        data = b"".join(orjson.dumps(record) + b"\n" for record in records)
         try:
-            with open(self.pending_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            # If file is corrupted, start fresh
-            print(f"Warning: Corrupted pending changes file, starting fresh: {e}")
-            return {}
-
-    def _save_pending_changes(self, changes: Dict[str, Dict[str, Any]]) -> None:
-        """Save pending changes to JSON file."""
+            with open(self.log_file, "ab", buffering=0) as f:
+                f.write(data)
+                log_size = f.tell()
+        except IOError as e:
+            # ``changes`` may already hold the unsaved mutation; reload next time
+            self._cache = None
+            raise CacheError(f"Failed to save pending changes: {e}")
+
+        if log_size >= _LOG_COMPACT_BYTES:
+            self._save_pending_changes(changes)
+            return
+
+        self._cache = changes
+        self._signature = self._file_signature()
+
+    def _save_pending_changes(self, changes: Dict[int, Dict[str, Any]]) -> None:
+        """Save pending changes to the JSON file and truncate the mutation log."""
         try:
-            with open(self.pending_file, "w", encoding="utf-8") as f:
-                json.dump(changes, f, indent=2, ensure_ascii=False)
+            tmp_file = f"{self.pending_file}.tmp"
+            with open(tmp_file, "wb") as f:
+                f.write(
+                    orjson.dumps(
+                        changes,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                    )
+                )
+            os.replace(tmp_file, self.pending_file)
+
+            if os.path.exists(self.log_file):
+                os.remove(self.log_file)
         except IOError as e:
             raise CacheError(f"Failed to save pending changes: {e}")
 
+        self._cache = changes
+        self._signature = self._file_signature()
+
+    def _file_signature(self) -> tuple:
+        """Identify the on-disk state so changes by other processes are noticed."""
+        signature = []
+        for path in (self.pending_file, self.log_file):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
     def get_file_path(self) -> str:
         """Get the path to the pending changes file."""
         return self.pending_file
 
     def file_exists(self) -> bool:
-        """Check if pending changes file exists."""
-        return os.path.exists(self.pending_file)
+        """Check if pending changes have been written to disk."""
+        return os.path.exists(self.pending_file) or os.path.exists(self.log_file)
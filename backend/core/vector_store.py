@@ -2,17 +2,57 @@
 Vector store management for RAG operations.
 """
 
+import functools
 import json
 import pickle
 import os
+import orjson
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import faiss
+import torch
 from .config import settings
 from .exceptions import CacheError
 
+# Cache files are written sequentially in one go; a large buffer turns many
+# small writes into a few big ones
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Order in which freshly written cache files are renamed into place; metadata
+# goes last because _load_from_cache treats it as the sign of a complete cache
+_CACHE_FILE_ORDER = (
+    "documents",
+    "document_texts",
+    "embeddings",
+    "faiss_index",
+    "metadata",
+)
+
+
+def _configure_faiss_threads() -> None:
+    """Pin FAISS's OpenMP thread count; the setting is process-wide."""
+    faiss.omp_set_num_threads(settings.faiss_threads or os.cpu_count() or 1)
+
+
+# Once per process, so creating or reloading a store never resets it
+_configure_faiss_threads()
+
+
+@functools.lru_cache(maxsize=4)
+def _get_embedder(model_name: str) -> SentenceTransformer:
+    """Load an embedding model once per process and share it between stores."""
+    print(f"📚 Loading embedding model: {model_name}")
+    if settings.embedder_threads > 0:
+        torch.set_num_threads(settings.embedder_threads)
+    return SentenceTransformer(model_name)
+
+
+def _format_faq_text(faq: Dict[str, Any]) -> str:
+    """Format one FAQ as an embedding passage (legacy format)."""
+    return f"passage: Q: {faq['question']}\nA: {faq['answer']}"
+
 
 class VectorStore:
     """Manages vector embeddings and similarity search using FAISS."""
@@ -26,6 +66,8 @@ class VectorStore:
         self.distance_metric = distance_metric or settings.vector_distance_metric
         self.embedder = None
         self.index = None
+        self.index_type = "flat"  # "flat" (exact) or "hnsw" (approximate)
+        self.quantization = "none"  # "none" (float32) or "sq8" (int8 codes)
         self.documents = []
         self.document_texts = []  # Store formatted texts like legacy
         self._initialized = False
@@ -69,34 +111,20 @@ class VectorStore:
         # Initialize embedder if needed
         self._initialize_embedder()
 
-        # Use legacy dual query strategy
-        # Query 1: Japanese-specific format
-        query_vector = self.embedder.encode([f"query: SUSTENについて：{query}"])
-        query_vector = np.array(query_vector).astype("float32")
-
-        # Query 2: Simple format
-        query_vector_2 = self.embedder.encode([f"query:{query}"])
-        query_vector_2 = np.array(query_vector_2).astype("float32")
-
-        # Normalize if using cosine similarity
-        if self.distance_metric == "cosine":
-            faiss.normalize_L2(query_vector)
-            faiss.normalize_L2(query_vector_2)
+        # Use legacy dual query strategy, embedded and searched as one batch
+        # Row 0: Japanese-specific format, row 1: simple format
+        query_vectors = self._encode(
+            [f"query: SUSTENについて：{query}", f"query:{query}"], batch_size=2
+        )
 
         # Search with both queries
-        _, top_indices = self.index.search(query_vector, top_k)
-        _, top_indices_2 = self.index.search(query_vector_2, top_k)
+        self._set_search_depth(top_k)
+        _, top_indices = self.index.search(query_vectors, top_k)
 
-        # Combine results from both queries (legacy behavior)
-        retrieved_context = "\n\n".join(
-            [self.document_texts[i] for i in top_indices[0]]
-        )
-        retrieved_context_2 = "\n\n".join(
-            [self.document_texts[i] for i in top_indices_2[0]]
-        )
-        retrieved_context = retrieved_context + "\n\n" + retrieved_context_2
-
-        return retrieved_context
+        # Combine results from both queries in rank order, keeping each FAQ
+        # once; -1 marks slots the index could not fill
+        hits = dict.fromkeys(int(i) for i in top_indices.ravel() if i >= 0)
+        return "\n\n".join(self.document_texts[i] for i in hits)
 
     def rebuild_cache(self, faq_manager) -> Dict[str, Any]:
         """Rebuild RAG cache with current FAQ data."""
@@ -140,26 +168,22 @@ class VectorStore:
         if not force_rebuild and self._load_from_cache():
             return True
 
-        # Load and format FAQ data only when cache doesn't exist or force rebuild
+        # Load and format FAQ data only when cache doesn't exist or force rebuild,
+        # formatting each row as it is streamed from the database
         print("📖 Loading FAQ database...")
-        faq_data = faq_manager.load_faqs_for_rag()
-        faq_count = len(faq_data)
-        print(f"✅ Loaded {faq_count} FAQ entries from database")
-
-        # Format texts using legacy format
-        print("🔄 Formatting FAQ texts...")
-        formatted_texts = self._format_faq_texts(faq_data)
+        faq_data = []
+        formatted_texts = []
+        for faq in faq_manager.iter_faqs_for_rag():
+            faq_data.append(faq)
+            formatted_texts.append(_format_faq_text(faq))
+        print(f"✅ Loaded {len(faq_data)} FAQ entries from database")
 
         # Build the index
         return self._build_index(faq_data, formatted_texts)
 
     def _format_faq_texts(self, faq_data: List[Dict[str, Any]]) -> List[str]:
         """Format FAQ data into texts using legacy format."""
-        texts = []
-        for faq in faq_data:
-            formatted_text = f"passage: Q: {faq['question']}\nA: {faq['answer']}"
-            texts.append(formatted_text)
-        return texts
+        return [_format_faq_text(faq) for faq in faq_data]
 
     def _build_index(self, documents: List[Dict[str, Any]], texts: List[str]) -> bool:
         """Build vector index from documents and texts."""
@@ -174,24 +198,33 @@ class VectorStore:
 
         # Create embeddings
         print(f"🔄 Creating embeddings for {len(texts)} texts...")
-        embeddings = self.embedder.encode(texts, show_progress_bar=True)
-        embeddings = np.array(embeddings).astype("float32")
+        embeddings = self._encode(
+            texts, batch_size=settings.embed_batch_size, show_progress_bar=False
+        )
 
-        # Build FAISS index based on distance metric
+        # Build FAISS index based on distance metric and corpus size
         dimension = embeddings.shape[1]
-        if self.distance_metric == "cosine":
+        self.quantization = "none"
+        if len(texts) > settings.ann_threshold:
+            self.index = self._create_hnsw_index(dimension)
+            self.index_type = "hnsw"
+            if settings.vector_quantization == "sq8":
+                # The scalar quantizer learns per-dimension value ranges
+                self.index.train(embeddings)
+                self.quantization = "sq8"
+        elif self.distance_metric == "cosine":
             self.index = faiss.IndexFlatIP(
                 dimension
             )  # Inner product for cosine similarity
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings)
+            self.index_type = "flat"
         else:  # L2 distance (default)
             self.index = faiss.IndexFlatL2(dimension)  # L2 distance
+            self.index_type = "flat"
 
         self.index.add(embeddings)
 
         print(
-            f"✅ Built FAISS index with {len(documents)} documents, dimension: {dimension}, metric: {self.distance_metric}"
+            f"✅ Built FAISS {self.index_type} index with {len(documents)} documents, dimension: {dimension}, metric: {self.distance_metric}"
         )
 
         # Save to cache
@@ -199,16 +232,50 @@ class VectorStore:
 
         return True
 
+    def _encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Embed texts as float32 rows, L2-normalized when using cosine similarity."""
+        embeddings = self.embedder.encode(
+            texts,
+            convert_to_numpy=True,
+            normalize_embeddings=self.distance_metric == "cosine",
+            **kwargs,
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def _create_hnsw_index(self, dimension: int):
+        """Create an HNSW graph index for approximate search on large corpora."""
+        metric = (
+            faiss.METRIC_INNER_PRODUCT
+            if self.distance_metric == "cosine"
+            else faiss.METRIC_L2
+        )
+        if settings.vector_quantization == "sq8":
+            # Store vectors as int8 codes: 4x less memory traffic per query
+            index = faiss.IndexHNSWSQ(
+                dimension, faiss.ScalarQuantizer.QT_8bit, 32, metric
+            )
+        else:
+            index = faiss.IndexHNSWFlat(dimension, 32, metric)
+        index.hnsw.efConstruction = 200
+        return index
+
+    def _set_search_depth(self, top_k: int):
+        """Widen the HNSW candidate list so top_k results stay accurate."""
+        if self.index_type == "hnsw":
+            self.index.hnsw.efSearch = max(top_k * 4, 32)
+
     def _initialize_embedder(self):
         """Lazy initialization of the embedding model."""
         if self.embedder is None:
-            print(f"📚 Loading embedding model: {self.model_name}")
-            self.embedder = SentenceTransformer(self.model_name)
+            self.embedder = _get_embedder(self.model_name)
 
     def _get_cache_paths(self) -> Dict[str, str]:
         """Get file paths for cached data."""
         return {
-            "documents": os.path.join(self.cache_dir, "documents.pkl"),
+            "documents": os.path.join(self.cache_dir, "documents.jsonl"),
+            # Written by cache version 1.0; migrated on first load
+            "legacy_documents": os.path.join(self.cache_dir, "documents.pkl"),
+            "document_texts": os.path.join(self.cache_dir, "document_texts.jsonl"),
             "embeddings": os.path.join(self.cache_dir, "embeddings.npy"),
             "faiss_index": os.path.join(self.cache_dir, "faiss_index.bin"),
             "metadata": os.path.join(self.cache_dir, "metadata.json"),
@@ -223,20 +290,16 @@ class VectorStore:
         self._initialize_embedder()
 
         # Create query embedding
-        query_embedding = self.embedder.encode([query])
-        query_embedding = np.array(query_embedding).astype("float32")
-
-        # Normalize if using cosine similarity
-        if self.distance_metric == "cosine":
-            faiss.normalize_L2(query_embedding)
+        query_embedding = self._encode([query])
 
         # Search
+        self._set_search_depth(top_k)
         scores, indices = self.index.search(query_embedding, top_k)
 
         # Format results
         results = []
         for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if idx < len(self.documents):
+            if 0 <= idx < len(self.documents):
                 result = self.documents[idx].copy()
                 result["similarity_score"] = float(score)
                 result["rank"] = i + 1
@@ -266,6 +329,8 @@ class VectorStore:
                 "document_count": metadata.get("document_count"),
                 "embedding_dimension": metadata.get("embedding_dimension"),
                 "distance_metric": metadata.get("distance_metric"),
+                "index_type": metadata.get("index_type", "flat"),
+                "quantization": metadata.get("quantization", "none"),
                 "created_at": metadata.get("created_at"),
                 "cache_dir": self.cache_dir,
                 "timestamp": datetime.now().isoformat(),
@@ -293,6 +358,8 @@ class VectorStore:
 
             # Reset in-memory data
             self.index = None
+            self.index_type = "flat"
+            self.quantization = "none"
             self.documents = []
             self.document_texts = []
 
@@ -308,17 +375,22 @@ class VectorStore:
     def _save_to_cache(self, embeddings: np.ndarray):
         """Save vector store data to cache files."""
         cache_paths = self._get_cache_paths()
+        # Write every file next to its final path and rename them into place
+        # only once all of them succeeded, metadata last, so a crash never
+        # leaves a half-written cache behind
+        tmp_paths = {key: f"{path}.tmp" for key, path in cache_paths.items()}
 
         try:
-            # Save documents
-            with open(cache_paths["documents"], "wb") as f:
-                pickle.dump(self.documents, f)
+            # Save documents and their formatted passages
+            self._write_documents(tmp_paths["documents"])
+            self._write_jsonl(tmp_paths["document_texts"], self.document_texts)
 
             # Save embeddings
-            np.save(cache_paths["embeddings"], embeddings)
+            with open(tmp_paths["embeddings"], "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+                np.save(f, embeddings)
 
             # Save FAISS index
-            faiss.write_index(self.index, cache_paths["faiss_index"])
+            faiss.write_index(self.index, tmp_paths["faiss_index"])
 
             # Save metadata
             metadata = {
@@ -326,29 +398,56 @@ class VectorStore:
                 "document_count": len(self.documents),
                 "embedding_dimension": embeddings.shape[1],
                 "distance_metric": self.distance_metric,
+                "index_type": self.index_type,
+                "quantization": self.quantization,
                 "created_at": str(np.datetime64("now")),
-                "cache_version": "1.0",
+                "cache_version": "2.0",
             }
 
-            with open(cache_paths["metadata"], "w") as f:
-                json.dump(metadata, f, indent=2)
+            with open(tmp_paths["metadata"], "wb") as f:
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+
+            for key in _CACHE_FILE_ORDER:
+                os.replace(tmp_paths[key], cache_paths[key])
 
             print(f"✅ Vector store cache saved to {self.cache_dir}")
             return True
 
         except Exception as e:
             print(f"⚠️ Failed to save vector store cache: {e}")
+            for tmp_path in tmp_paths.values():
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
             return False
 
+    def _write_documents(self, path: str):
+        """Write documents as JSON Lines, one document per line."""
+        self._write_jsonl(path, self.documents)
+
+    def _write_jsonl(self, path: str, items: List[Any]):
+        """Write items as JSON Lines, one item per line."""
+        with open(path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            for item in items:
+                f.write(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE))
+
+    def _read_jsonl(self, path: str) -> List[Any]:
+        """Read a JSON Lines file written by _write_jsonl."""
+        with open(path, "rb") as f:
+            return [orjson.loads(line) for line in f]
+
     def _load_from_cache(self) -> bool:
         """Load vector store data from cache files."""
         cache_paths = self._get_cache_paths()
 
         # Check if all required files exist
-        required_files = ["documents", "embeddings", "faiss_index", "metadata"]
+        required_files = ["embeddings", "faiss_index", "metadata"]
         for file_key in required_files:
             if not os.path.exists(cache_paths[file_key]):
                 return False
+        if not os.path.exists(cache_paths["documents"]) and not os.path.exists(
+            cache_paths["legacy_documents"]
+        ):
+            return False
 
         try:
             # Load metadata first to verify compatibility
@@ -371,14 +470,40 @@ class VectorStore:
                 self.distance_metric = cached_metric
 
             # Load documents
-            with open(cache_paths["documents"], "rb") as f:
-                self.documents = pickle.load(f)
-
-            # Load FAISS index
-            self.index = faiss.read_index(cache_paths["faiss_index"])
+            if os.path.exists(cache_paths["documents"]):
+                self.documents = self._read_jsonl(cache_paths["documents"])
+            else:
+                # Version 1.0 cache: read the pickle once and rewrite as JSONL.
+                # Rename into place before dropping the pickle so an interrupted
+                # migration never leaves a truncated documents.jsonl behind
+                with open(cache_paths["legacy_documents"], "rb") as f:
+                    self.documents = pickle.load(f)
+                tmp_path = f"{cache_paths['documents']}.tmp"
+                try:
+                    self._write_documents(tmp_path)
+                    os.replace(tmp_path, cache_paths["documents"])
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                os.remove(cache_paths["legacy_documents"])
+
+            # Load FAISS index (read_index restores the stored index class).
+            # The vectors are memory-mapped read-only so only the pages a
+            # search touches are paged in.
+            self.index = faiss.read_index(
+                cache_paths["faiss_index"],
+                faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY,
+            )
+            self.index_type = metadata.get("index_type", "flat")
+            self.quantization = metadata.get("quantization", "none")
 
-            # Reconstruct document_texts from documents using legacy format
-            self.document_texts = self._format_faq_texts(self.documents)
+            # Read the saved passages; caches written before they were saved
+            # fall back to formatting them from the documents
+            if os.path.exists(cache_paths["document_texts"]):
+                self.document_texts = self._read_jsonl(cache_paths["document_texts"])
+            else:
+                self.document_texts = self._format_faq_texts(self.documents)
 
             print(f"✅ Vector store cache loaded from {self.cache_dir}")
             print(
@@ -1,7 +1,16 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional, List
 from datetime import datetime
 
+# Kept in display order for validation error messages
+VALID_STATUSES = ("public", "private", "pending")
+
+
+class ResponseModel(BaseModel):
+    """Immutable base for models the API builds and returns."""
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 # Pydantic models for API request/response
 class QueryRequest(BaseModel):
@@ -10,7 +19,7 @@ class QueryRequest(BaseModel):
     top_k: int = 3
 
 
-class CacheInfoResponse(BaseModel):
+class CacheInfoResponse(ResponseModel):
     cached: bool
     cache_dir: Optional[str] = None
     metadata: Optional[dict] = None
@@ -18,14 +27,14 @@ class CacheInfoResponse(BaseModel):
     error: Optional[str] = None
 
 
-class CacheActionResponse(BaseModel):
+class CacheActionResponse(ResponseModel):
     success: bool
     message: str
     timestamp: str
 
 
 # FAQ Management Models
-class FAQResponse(BaseModel):
+class FAQResponse(ResponseModel):
     id: int
     question: str
     answer: str
@@ -36,12 +45,14 @@ class FAQResponse(BaseModel):
     updated_at: Optional[str] = None
 
 
-class FAQListResponse(BaseModel):
+class FAQListResponse(ResponseModel):
     faqs: List[FAQResponse]
     total: int
     limit: int
     offset: int
     has_more: bool
+    # Cursor for the next page (pass as after_id); None on the last page
+    next_after_id: Optional[int] = None
 
 
 class FAQCreateRequest(BaseModel):
@@ -54,7 +65,7 @@ class FAQCreateRequest(BaseModel):
     @field_validator("status")
     @classmethod
     def validate_status(cls, v):
-        if v not in ["public", "private", "pending"]:
+        if v not in VALID_STATUSES:
             raise ValueError('status must be "public", "private", or "pending"')
         return v
 
@@ -69,19 +80,19 @@ class FAQUpdateRequest(BaseModel):
     @field_validator("status")
     @classmethod
     def validate_status(cls, v):
-        if v is not None and v not in ["public", "private", "pending"]:
+        if v is not None and v not in VALID_STATUSES:
             raise ValueError('status must be "public", "private", or "pending"')
         return v
 
 
-class FAQCreateResponse(BaseModel):
+class FAQCreateResponse(ResponseModel):
     success: bool
     message: str
     faq: Optional[FAQResponse] = None
     timestamp: str
 
 
-class FAQUpdateResponse(BaseModel):
+class FAQUpdateResponse(ResponseModel):
     success: bool
     message: str
     faq: Optional[FAQResponse] = None
@@ -89,7 +100,7 @@ class FAQUpdateResponse(BaseModel):
     timestamp: str
 
 
-class FAQDeleteResponse(BaseModel):
+class FAQDeleteResponse(ResponseModel):
     success: bool
     message: str
     deleted_faq: Optional[FAQResponse] = None
@@ -97,14 +108,14 @@ class FAQDeleteResponse(BaseModel):
 
 
 # Pending Changes Models
-class PendingChangeResponse(BaseModel):
+class PendingChangeResponse(ResponseModel):
     faq_id: int
     change_type: str
     original_status: Optional[str] = None
     timestamp: str
 
 
-class PendingChangesResponse(BaseModel):
+class PendingChangesResponse(ResponseModel):
     changes: List[PendingChangeResponse]
     total_count: int
     stats: dict
@@ -112,7 +123,7 @@ class PendingChangesResponse(BaseModel):
     timestamp: str
 
 
-class StatusRestoreResponse(BaseModel):
+class StatusRestoreResponse(ResponseModel):
     success: bool
     restored_count: int
     cleared_count: int
@@ -46,20 +46,23 @@ def test_db_manager(temp_db):
     db_manager = DatabaseManager(temp_db)
     db_manager.initialize_schema()
 
-    return db_manager
+    yield db_manager
+
+    db_manager.close()
 
 
 @pytest.fixture(scope="function")
-def test_faq_manager(test_db_manager):
+def test_faq_manager(test_db_manager, tmp_path):
     """Create a test FAQ manager with initialized database."""
     from core.faq import FAQManager
+    from core.pending_changes import PendingChangesManager
 
-    return FAQManager(test_db_manager)
+    # Keep pending changes out of the real rag_cache directory
+    return FAQManager(test_db_manager, PendingChangesManager(str(tmp_path)))
 
 
-@pytest.fixture(scope="function")
-def test_app(test_faq_manager):
-    """Create a test FastAPI app with proper dependencies."""
+def _create_test_app(faq_manager):
+    """Build a FastAPI app wired to ``faq_manager`` and mocked services."""
     from fastapi import FastAPI
     from unittest.mock import Mock
     from core.vector_store import VectorStore
@@ -116,7 +119,7 @@ def test_app(test_faq_manager):
     }
 
     # Override dependencies
-    app.dependency_overrides[get_faq_manager] = lambda: test_faq_manager
+    app.dependency_overrides[get_faq_manager] = lambda: faq_manager
     app.dependency_overrides[get_vector_store] = lambda: mock_vector_store
     app.dependency_overrides[get_claude_client] = lambda: mock_claude_client
     app.dependency_overrides[get_pending_changes_manager] = lambda: mock_pending_changes
@@ -133,9 +136,49 @@ def test_app(test_faq_manager):
     return app
 
 
+@pytest.fixture(scope="function")
+def test_app(test_faq_manager):
+    """Create a test FastAPI app with proper dependencies."""
+    return _create_test_app(test_faq_manager)
+
+
 @pytest.fixture(scope="function")
 def test_client(test_app):
     """Create a test client for the FastAPI app."""
     from fastapi.testclient import TestClient
 
-    return TestClient(test_app)
+    with TestClient(test_app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def shared_test_app(tmp_path_factory):
+    """Create one FastAPI app for tests that never modify its database."""
+    from core.database import DatabaseManager
+    from core.faq import FAQManager
+    from core.pending_changes import PendingChangesManager
+
+    db_manager = DatabaseManager(str(tmp_path_factory.mktemp("db") / "shared.db"))
+    db_manager.initialize_schema()
+
+    pending_changes = PendingChangesManager(str(tmp_path_factory.mktemp("cache")))
+
+    yield _create_test_app(FAQManager(db_manager, pending_changes))
+
+    db_manager.close()
+
+
+@pytest.fixture(scope="session")
+def shared_test_client(shared_test_app):
+    """Create one test client for read-only tests of the shared app."""
+    from fastapi.testclient import TestClient
+
+    # Entering the client runs the app's startup once for the whole session
+    with TestClient(shared_test_app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def openapi_schema(shared_test_client):
+    """Fetch and parse the OpenAPI schema once per test session."""
+    return shared_test_client.get("/openapi.json").json()
@@ -3,6 +3,7 @@ Tests for cache routes functionality with mocked dependencies for fast execution
 """
 
 import pytest
+from types import MappingProxyType
 from unittest.mock import Mock
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
@@ -14,44 +15,60 @@ from api.dependencies import get_vector_store, get_faq_manager
 app = FastAPI()
 app.include_router(router)
 
+# Default mock results; the routes only read them, so every test can share them.
+# Tests that need a different result assign their own fresh dict.
+_CACHE_INFO_OK = MappingProxyType(
+    {
+        "cached": True,
+        "model_name": "all-MiniLM-L6-v2",
+        "document_count": 134,
+        "embedding_dimension": 384,
+        "distance_metric": "cosine",
+        "created_at": "2024-01-01T00:00:00",
+        "cache_dir": "/path/to/cache",
+        "timestamp": "2024-01-01T00:00:00",
+    }
+)
+
+_REBUILD_OK = MappingProxyType(
+    {
+        "success": True,
+        "message": "Cache rebuilt successfully with 134 documents",
+    }
+)
+
+
+@pytest.fixture(scope="class")
+def cache_client():
+    """Create one test client with mocked dependencies for the whole class."""
+    mock_vector_store = Mock()
+    mock_faq_manager = Mock()
+
+    # Override dependencies
+    app.dependency_overrides[get_vector_store] = lambda: mock_vector_store
+    app.dependency_overrides[get_faq_manager] = lambda: mock_faq_manager
+
+    # Create test client after overriding dependencies
+    with TestClient(app) as client:
+        yield client, mock_vector_store, mock_faq_manager
+
+    # Clear dependency overrides
+    app.dependency_overrides.clear()
+
 
 class TestCacheRoutes:
     """Test the cache routes with mocked dependencies."""
 
-    def setup_method(self):
-        """Set up test environment for each test."""
-        # Create mock objects
-        self.mock_vector_store = Mock()
-        self.mock_faq_manager = Mock()
+    @pytest.fixture(autouse=True)
+    def reset_mocks(self, cache_client):
+        """Restore the shared mocks to their default behavior before each test."""
+        self.client, self.mock_vector_store, self.mock_faq_manager = cache_client
+        self.mock_vector_store.reset_mock(return_value=True, side_effect=True)
+        self.mock_faq_manager.reset_mock(return_value=True, side_effect=True)
 
         # Configure mock vector store default behavior to match actual VectorStore.get_cache_info()
-        self.mock_vector_store.get_cache_info.return_value = {
-            "cached": True,
-            "model_name": "all-MiniLM-L6-v2",
-            "document_count": 134,
-            "embedding_dimension": 384,
-            "distance_metric": "cosine",
-            "created_at": "2024-01-01T00:00:00",
-            "cache_dir": "/path/to/cache",
-            "timestamp": "2024-01-01T00:00:00",
-        }
-
-        self.mock_vector_store.rebuild_cache.return_value = {
-            "success": True,
-            "message": "Cache rebuilt successfully with 134 documents",
-        }
-
-        # Override dependencies
-        app.dependency_overrides[get_vector_store] = lambda: self.mock_vector_store
-        app.dependency_overrides[get_faq_manager] = lambda: self.mock_faq_manager
-
-        # Create test client after overriding dependencies
-        self.client = TestClient(app)
-
-    def teardown_method(self):
-        """Clean up after each test."""
-        # Clear dependency overrides
-        app.dependency_overrides.clear()
+        self.mock_vector_store.get_cache_info.return_value = _CACHE_INFO_OK
+        self.mock_vector_store.rebuild_cache.return_value = _REBUILD_OK
 
     def test_get_cache_info_endpoint_exists(self):
         """Test that the GET /cache endpoint exists."""
@@ -101,50 +118,35 @@ class TestCacheRoutes:
         assert "timestamp" in data
         assert data["success"] is True
 
-    def test_http_methods(self):
-        """Test HTTP methods."""
-        # GET /cache should work
-        response = self.client.get("/cache")
-        assert response.status_code == 200
-
-        # POST /cache should not be allowed
-        response = self.client.post("/cache")
-        assert response.status_code == 405
-
-        # POST /cache/rebuild should work
-        response = self.client.post("/cache/rebuild")
-        assert response.status_code == 200
-
-        # GET /cache/rebuild should not be allowed
-        response = self.client.get("/cache/rebuild")
-        assert response.status_code == 405
+    @pytest.mark.parametrize(
+        "method,path,status",
+        [
+            ("GET", "/cache", 200),
+            ("POST", "/cache", 405),
+            ("POST", "/cache/rebuild", 200),
+            ("GET", "/cache/rebuild", 405),
+            ("GET", "/caches", 404),
+            ("POST", "/cache/clear", 404),
+        ],
+    )
+    def test_routing(self, method, path, status):
+        """Test that methods and paths are routed correctly."""
+        response = self.client.request(method, path)
+        assert response.status_code == status
 
     def test_cache_workflow(self):
         """Test a complete cache workflow: info -> rebuild -> info."""
-        # Get initial cache info
-        info_response = self.client.get("/cache")
-        assert info_response.status_code == 200
-
-        initial_data = info_response.json()
-        assert "cached" in initial_data
-
-        # Rebuild cache
-        rebuild_response = self.client.post("/cache/rebuild")
-        assert rebuild_response.status_code == 200
-
-        rebuild_data = rebuild_response.json()
-        assert rebuild_data["success"] is True
-
-        # Get cache info after rebuild
-        final_info_response = self.client.get("/cache")
-        assert final_info_response.status_code == 200
-
-        final_data = final_info_response.json()
-        assert "cached" in final_data
-
-        # Verify mock calls
-        assert self.mock_vector_store.get_cache_info.call_count == 2
-        self.mock_vector_store.rebuild_cache.assert_called_once()
+        # Response shapes are covered by the structure tests; only check the
+        # calls reach the vector store in order
+        assert self.client.get("/cache").status_code == 200
+        assert self.client.post("/cache/rebuild").status_code == 200
+        assert self.client.get("/cache").status_code == 200
+
+        assert [call[0] for call in self.mock_vector_store.method_calls] == [
+            "get_cache_info",
+            "rebuild_cache",
+            "get_cache_info",
+        ]
 
     def test_multiple_cache_rebuild_requests(self):
         """Test that multiple cache rebuild requests work correctly."""
@@ -164,22 +166,6 @@ class TestCacheRoutes:
         # Verify mock was called 3 times
         assert self.mock_vector_store.rebuild_cache.call_count == 3
 
-    def test_route_paths(self):
-        """Test that routes are correctly configured."""
-        # Correct paths should work
-        response = self.client.get("/cache")
-        assert response.status_code == 200
-
-        response = self.client.post("/cache/rebuild")
-        assert response.status_code == 200
-
-        # Incorrect paths should return 404
-        response = self.client.get("/caches")
-        assert response.status_code == 404
-
-        response = self.client.post("/cache/clear")
-        assert response.status_code == 404
-
     def test_dependency_injection(self):
         """Test that dependencies are properly injected."""
         # Test cache info endpoint
@@ -226,7 +212,3 @@ class TestCacheRoutes:
         assert data["cached"] is False
         # Now the route properly maps 'message' to 'error' field
         assert data["error"] == "Cache not found"
-
-
-if __name__ == "__main__":
-    pytest.main([__file__])
@@ -3,13 +3,38 @@ Tests for Claude AI client integration.
 """
 
 import pytest
-import asyncio
 import json
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 from datetime import datetime
+from types import SimpleNamespace
 from core.claude_client import ClaudeClient, Message
-from core.exceptions import ExternalServiceError
-from core.config import Settings
+
+
+def make_settings(**overrides):
+    """Build a lightweight stand-in for the Claude client's settings."""
+    values = {
+        "aws_access_key_id": "test_access_key",
+        "aws_secret_access_key": "test_secret_key",
+        "aws_region": "us-east-1",
+        "claude_model": "claude-3-sonnet-20240229",
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def parse_sse(chunk: str) -> dict:
+    """Decode the JSON payload of one server-sent event."""
+    _, _, rest = chunk.partition("data: ")
+    payload, _, _ = rest.partition("\n\n")
+    return json.loads(payload)
+
+
+SAMPLE_TS = datetime(2024, 1, 1)
+SAMPLE_MESSAGES = [
+    Message("1", "Hello", {"id": "user1"}, SAMPLE_TS),
+    Message("2", "How are you?", {"id": "susten-ai"}, SAMPLE_TS),
+    Message("3", "What is Python?", {"id": "user1"}, SAMPLE_TS),
+]
 
 
 class TestMessage:
@@ -17,7 +42,7 @@ class TestMessage:
 
     def test_message_creation(self):
         """Test creating Message object."""
-        timestamp = datetime.now()
+        timestamp = SAMPLE_TS
         sender = {"id": "user1", "name": "Test User"}
 
         message = Message(
@@ -36,7 +61,7 @@ class TestMessage:
 
     def test_message_creation_defaults(self):
         """Test Message creation with default values."""
-        timestamp = datetime.now()
+        timestamp = SAMPLE_TS
         sender = {"id": "user1"}
 
         message = Message(
@@ -46,28 +71,28 @@ class TestMessage:
         assert message.isCurrentUser is False
 
 
+@pytest.fixture(scope="class")
+def patched_aws():
+    """Patch the Claude client's settings and boto3 once per test class."""
+    with patch("core.claude_client.settings", make_settings()):
+        with patch("core.claude_client.boto3.client") as mock_boto:
+            yield mock_boto
+
+
 class TestClaudeClient:
     """Test the ClaudeClient class."""
 
-    def setup_method(self):
-        """Set up test environment for each test."""
-        self.mock_settings = Mock(spec=Settings)
-        self.mock_settings.aws_access_key_id = "test_access_key"
-        self.mock_settings.aws_secret_access_key = "test_secret_key"
-        self.mock_settings.aws_region = "us-east-1"
-        self.mock_settings.claude_model = "claude-3-sonnet-20240229"
-
-    @patch("core.claude_client.settings")
-    @patch("core.claude_client.boto3.client")
-    def test_initialization_success(self, mock_boto_client, mock_settings):
-        """Test successful ClaudeClient initialization."""
-        mock_settings.aws_access_key_id = "test_key"
-        mock_settings.aws_secret_access_key = "test_secret"
-        mock_settings.aws_region = "us-east-1"
-        mock_settings.claude_model = "claude-3-sonnet-20240229"
+    @pytest.fixture(autouse=True)
+    def reset_aws(self, patched_aws):
+        """Give each test a fresh boto3 client mock on the shared patches."""
+        self.mock_boto = patched_aws
+        self.mock_boto.reset_mock(return_value=True, side_effect=True)
+        self.mock_boto.return_value = Mock()
 
+    def test_initialization_success(self):
+        """Test successful ClaudeClient initialization."""
         mock_bedrock_client = Mock()
-        mock_boto_client.return_value = mock_bedrock_client
+        self.mock_boto.return_value = mock_bedrock_client
 
         client = ClaudeClient()
 
@@ -75,178 +100,122 @@ class TestClaudeClient:
         assert client.model_id == "claude-3-sonnet-20240229"
         assert client.bedrock_client == mock_bedrock_client
 
-    @patch("core.claude_client.settings")
-    @patch("core.claude_client.boto3.client")
-    def test_initialization_boto3_error(self, mock_boto_client, mock_settings):
+    def test_initialization_boto3_error(self):
         """Test ClaudeClient initialization with boto3 error."""
-        mock_settings.aws_access_key_id = "test_key"
-        mock_settings.aws_secret_access_key = "test_secret"
-        mock_settings.aws_region = "us-east-1"
-        mock_settings.claude_model = "claude-3-sonnet-20240229"
-
-        mock_boto_client.side_effect = Exception("AWS configuration error")
+        self.mock_boto.side_effect = Exception("AWS configuration error")
 
         client = ClaudeClient()
         assert client.bedrock_client is None
 
     def test_initialize_success(self):
         """Test successful client initialization."""
-        with patch("core.claude_client.settings", self.mock_settings):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_bedrock_client = Mock()
-                mock_boto.return_value = mock_bedrock_client
-
-                client = ClaudeClient()
-                result = client.initialize()
+        client = ClaudeClient()
+        result = client.initialize()
 
-                assert result is True
-                assert client._initialized is True
+        assert result is True
+        assert client._initialized is True
 
-    def test_initialize_credential_validation_failure(self):
+    def test_initialize_credential_validation_failure(self, monkeypatch):
         """Test initialization with credential validation failure."""
-        settings_no_creds = Mock(spec=Settings)
-        settings_no_creds.aws_access_key_id = None
-        settings_no_creds.aws_secret_access_key = "test_secret"
-        settings_no_creds.aws_region = "us-east-1"
-        settings_no_creds.claude_model = "claude-3-sonnet-20240229"
+        monkeypatch.setattr(
+            "core.claude_client.settings", make_settings(aws_access_key_id=None)
+        )
 
-        with patch("core.claude_client.settings", settings_no_creds):
-            with patch("core.claude_client.boto3.client"):
-                client = ClaudeClient()
-                result = client.initialize()
+        client = ClaudeClient()
+        result = client.initialize()
 
-                assert result is False
-                assert client._initialized is False
+        assert result is False
+        assert client._initialized is False
 
     def test_is_ready_true(self):
         """Test is_ready returns True when initialized."""
-        with patch("core.claude_client.settings", self.mock_settings):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_boto.return_value = Mock()
-
-                client = ClaudeClient()
-                client._initialized = True
+        client = ClaudeClient()
+        client._initialized = True
 
-                assert client.is_ready() is True
+        assert client.is_ready() is True
 
     def test_is_ready_false(self):
         """Test is_ready returns False when not initialized."""
-        with patch("core.claude_client.settings", self.mock_settings):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_boto.return_value = Mock()
-
-                client = ClaudeClient()
-                client._initialized = False
+        client = ClaudeClient()
+        client._initialized = False
 
-                assert client.is_ready() is False
+        assert client.is_ready() is False
 
     def test_validate_credentials_success(self):
         """Test successful credential validation."""
-        with patch("core.claude_client.settings", self.mock_settings):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_boto.return_value = Mock()
-
-                client = ClaudeClient()
-                is_valid, error_msg = client.validate_credentials()
+        client = ClaudeClient()
+        is_valid, error_msg = client.validate_credentials()
 
-                assert is_valid is True
-                assert error_msg == ""
+        assert is_valid is True
+        assert error_msg == ""
 
-    def test_validate_credentials_missing_access_key(self):
+    def test_validate_credentials_missing_access_key(self, monkeypatch):
         """Test credential validation with missing access key."""
-        settings_no_access = Mock(spec=Settings)
-        settings_no_access.aws_access_key_id = None
-        settings_no_access.aws_secret_access_key = "test_secret"
-        settings_no_access.aws_region = "us-east-1"
-        settings_no_access.claude_model = "claude-3-sonnet-20240229"
-
-        with patch("core.claude_client.settings", settings_no_access):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_boto.return_value = Mock()
+        monkeypatch.setattr(
+            "core.claude_client.settings", make_settings(aws_access_key_id=None)
+        )
 
-                client = ClaudeClient()
-                is_valid, error_msg = client.validate_credentials()
+        client = ClaudeClient()
+        is_valid, error_msg = client.validate_credentials()
 
-                assert is_valid is False
-                assert "AWS credentials not configured" in error_msg
+        assert is_valid is False
+        assert "AWS credentials not configured" in error_msg
 
     def test_validate_credentials_no_bedrock_client(self):
         """Test credential validation with no bedrock client."""
-        with patch("core.claude_client.settings", self.mock_settings):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_boto.return_value = None
+        self.mock_boto.return_value = None
 
-                client = ClaudeClient()
-                client.bedrock_client = None
-                is_valid, error_msg = client.validate_credentials()
+        client = ClaudeClient()
+        client.bedrock_client = None
+        is_valid, error_msg = client.validate_credentials()
 
-                assert is_valid is False
-                assert "Failed to initialize AWS Bedrock client" in error_msg
+        assert is_valid is False
+        assert "Failed to initialize AWS Bedrock client" in error_msg
 
     def test_build_conversation_context(self):
         """Test building conversation context from message history."""
-        with patch("core.claude_client.settings", self.mock_settings):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_boto.return_value = Mock()
-
-                client = ClaudeClient()
-
-                messages = [
-                    Message("1", "Hello", {"id": "user1"}, datetime.now()),
-                    Message("2", "How are you?", {"id": "susten-ai"}, datetime.now()),
-                    Message("3", "What is Python?", {"id": "user1"}, datetime.now()),
-                ]
+        client = ClaudeClient()
 
-                context = client.build_conversation_context(messages)
+        context = client.build_conversation_context(SAMPLE_MESSAGES)
 
-                assert "User: Hello" in context
-                assert "User: What is Python?" in context
-                assert "How are you?" not in context  # AI messages filtered out
+        assert "User: Hello" in context
+        assert "User: What is Python?" in context
+        assert "How are you?" not in context  # AI messages filtered out
 
     def test_create_system_prompt(self):
         """Test creating system prompt."""
-        with patch("core.claude_client.settings", self.mock_settings):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_boto.return_value = Mock()
-
-                client = ClaudeClient()
+        client = ClaudeClient()
 
-                message = "What is Python?"
-                conversation_context = "User: Hello"
-                retrieved_context = "Python is a programming language."
+        message = "What is Python?"
+        conversation_context = "User: Hello"
+        retrieved_context = "Python is a programming language."
 
-                prompt = client.create_system_prompt(
-                    message, conversation_context, retrieved_context
-                )
+        prompt = client.create_system_prompt(
+            message, conversation_context, retrieved_context
+        )
 
-                assert "SUSTEN AI" in prompt
-                assert message in prompt
-                assert conversation_context in prompt
-                assert retrieved_context in prompt
+        assert "SUSTEN AI" in prompt
+        assert message in prompt
+        assert conversation_context in prompt
+        assert retrieved_context in prompt
 
     @pytest.mark.asyncio
-    async def test_ask_with_context_stream_credential_error(self):
+    async def test_ask_with_context_stream_credential_error(self, monkeypatch):
         """Test streaming with credential error."""
-        settings_no_creds = Mock(spec=Settings)
-        settings_no_creds.aws_access_key_id = None
-        settings_no_creds.aws_secret_access_key = "test_secret"
-        settings_no_creds.aws_region = "us-east-1"
-        settings_no_creds.claude_model = "claude-3-sonnet-20240229"
-
-        with patch("core.claude_client.settings", settings_no_creds):
-            with patch("core.claude_client.boto3.client") as mock_boto:
-                mock_boto.return_value = Mock()
+        monkeypatch.setattr(
+            "core.claude_client.settings", make_settings(aws_access_key_id=None)
+        )
 
-                client = ClaudeClient()
+        client = ClaudeClient()
 
-                chunks = []
-                async for chunk in client.ask_with_context_stream("Test message"):
-                    chunks.append(chunk)
+        chunks = []
+        async for chunk in client.ask_with_context_stream("Test message"):
+            chunks.append(chunk)
 
-                assert len(chunks) == 1
-                chunk_data = json.loads(chunks[0].split("data: ")[1].split("\n\n")[0])
-                assert chunk_data["type"] == "error"
-                assert "AWS credentials not configured" in chunk_data["text"]
+        assert len(chunks) == 1
+        chunk_data = parse_sse(chunks[0])
+        assert chunk_data["type"] == "error"
+        assert "AWS credentials not configured" in chunk_data["text"]
 
     def test_dict_to_message(self):
         """Test converting dictionary to Message object."""
@@ -278,7 +247,3 @@ class TestClaudeClient:
         assert message.sender == {}
         assert isinstance(message.timestamp, datetime)
         assert message.isCurrentUser is False
-
-
-if __name__ == "__main__":
-    pytest.main([__file__])
@@ -2,152 +2,182 @@
 Tests for Claude routes functionality.
 """
 
+import asyncio
+import functools
+import httpx
+import orjson
 import pytest
-import json
-from fastapi.testclient import TestClient
+import pytest_asyncio
 from fastapi import FastAPI
 from api.routes.claude_routes import router
+from api.dependencies import get_claude_client, get_vector_store
 
 
-# Create a test app with the Claude router
-app = FastAPI()
-app.include_router(router)
+@functools.lru_cache(maxsize=1)
+def get_app() -> FastAPI:
+    """Build the test app with the Claude router once; fixtures reuse it."""
+    app = FastAPI()
+    app.include_router(router)
+    return app
 
 
-class TestClaudeRoutes:
-    """Test the Claude routes."""
-
-    def setup_method(self):
-        """Set up test environment for each test."""
-        self.client = TestClient(app)
-
-    def test_query_with_rag_endpoint_exists(self):
-        """Test that the POST /query-with-rag endpoint exists."""
-        # Test with minimal valid data
-        query_data = {
-            "message": "What is the investment strategy?",
-            "conversationHistory": "",
-            "top_k": 3,
-        }
+pytestmark = pytest.mark.asyncio
 
-        response = self.client.post("/query-with-rag", json=query_data)
 
-        # Should not be 404 (endpoint exists)
-        assert response.status_code != 404
+class FakeClaudeClient:
+    """Stand-in for ClaudeClient that streams a fixed answer without AWS."""
 
-        # Should be either 200 (success) or 503 (service unavailable during init)
-        assert response.status_code in [200, 503]
+    def __init__(self):
+        self.ready = True
 
-        if response.status_code == 503:
-            # System is initializing
-            assert "initializing" in response.json()["detail"].lower()
+    def is_ready(self):
+        return self.ready
 
-    def test_query_with_rag_streaming_response(self):
-        """Test that the endpoint returns a streaming response."""
-        query_data = {
-            "message": "Tell me about investment options",
-            "conversationHistory": "",
-            "top_k": 5,
-        }
+    async def ask_with_context_stream(
+        self, message, retrieved_context="", top_k=3, conversation_history=""
+    ):
+        yield 'data: {"type": "content", "text": "Test answer"}\n\n'
+        yield 'data: {"type": "done"}\n\n'
 
-        response = self.client.post("/query-with-rag", json=query_data)
 
-        if response.status_code == 200:
-            # Check that it's a streaming response
-            assert response.headers.get("content-type") == "text/event-stream"
+class FakeVectorStore:
+    """Stand-in for VectorStore that returns a fixed RAG context."""
 
-            # Check streaming headers
-            assert response.headers.get("cache-control") == "no-cache"
-            assert response.headers.get("connection") == "keep-alive"
-            assert response.headers.get("access-control-allow-origin") == "*"
-            assert response.headers.get("access-control-allow-headers") == "*"
+    def search_similar_faqs(self, query, top_k=None):
+        return "Test context"
 
-            # Check that we get some streamed content
-            content = response.content.decode()
-            assert len(content) > 0
 
-    def test_query_with_rag_required_fields(self):
-        """Test that required fields are validated."""
-        # Test missing message field
-        response = self.client.post(
-            "/query-with-rag", json={"conversationHistory": "", "top_k": 3}
-        )
-        assert response.status_code == 422
+fake_claude_client = FakeClaudeClient()
 
-        # Test with all required fields
-        response = self.client.post("/query-with-rag", json={"message": "Test query"})
-        # Should not fail due to missing fields (other fields have defaults)
-        assert response.status_code != 422
 
-    def test_query_with_rag_empty_message(self):
-        """Test that empty messages are rejected."""
-        query_data = {"message": "", "conversationHistory": "", "top_k": 3}
+@pytest.fixture(scope="module")
+def fake_dependencies():
+    """Serve the fake Claude client and vector store for this module's tests."""
+    app = get_app()
+    app.dependency_overrides[get_claude_client] = lambda: fake_claude_client
+    app.dependency_overrides[get_vector_store] = FakeVectorStore
 
-        response = self.client.post("/query-with-rag", json=query_data)
-        # Should return 400 for empty message, or 503 if system is initializing
-        assert response.status_code in [400, 503]
+    yield
 
-        if response.status_code == 400:
-            assert "empty" in response.json()["detail"].lower()
-        elif response.status_code == 503:
-            assert "initializing" in response.json()["detail"].lower()
+    app.dependency_overrides.clear()
 
-        # Test with whitespace-only message
-        query_data["message"] = "   "
-        response = self.client.post("/query-with-rag", json=query_data)
-        assert response.status_code in [400, 503]
 
-    def test_query_with_rag_default_values(self):
-        """Test that default values work correctly."""
-        # Test with minimal data (should use defaults)
-        query_data = {"message": "Test query with defaults"}
+@pytest_asyncio.fixture
+async def client(fake_dependencies):
+    """Call the app in-process through httpx's ASGI transport."""
+    transport = httpx.ASGITransport(app=get_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
 
-        response = self.client.post("/query-with-rag", json=query_data)
 
-        # Should not fail due to missing optional fields
-        assert response.status_code != 422
-        assert response.status_code in [200, 503]  # 503 if system initializing
+class TestClaudeRoutes:
+    """Test the Claude routes."""
 
-    def test_query_with_rag_custom_parameters(self):
-        """Test with custom parameters."""
+    @pytest.mark.parametrize(
+        "payload,expected",
+        [
+            # Minimal valid data
+            (
+                {
+                    "message": "What is the investment strategy?",
+                    "conversationHistory": "",
+                    "top_k": 3,
+                },
+                200,
+            ),
+            # Optional fields fall back to their defaults
+            ({"message": "Test query with defaults"}, 200),
+            # Missing message field
+            ({"conversationHistory": "", "top_k": 3}, 422),
+            # Custom parameters
+            (
+                {
+                    "message": "What are the investment risks?",
+                    "conversationHistory": "User: Hello\nAI: Hi there!",
+                    "top_k": 10,
+                },
+                200,
+            ),
+        ],
+    )
+    async def test_query_with_rag_payloads(self, client, payload, expected):
+        """Test that valid payloads are answered and invalid ones rejected."""
+        response = await client.post("/query-with-rag", json=payload)
+        assert response.status_code == expected
+
+    async def test_query_with_rag_initializing(self, client, monkeypatch):
+        """Test that queries are rejected while the Claude client is not ready."""
+        monkeypatch.setattr(fake_claude_client, "ready", False)
+
+        response = await client.post("/query-with-rag", json={"message": "Test query"})
+
+        assert response.status_code == 503
+        assert "initializing" in response.json()["detail"].lower()
+
+    async def test_query_with_rag_streaming_response(self, client):
+        """Test that the endpoint returns a streaming response."""
         query_data = {
-            "message": "What are the investment risks?",
-            "conversationHistory": "User: Hello\nAI: Hi there!",
-            "top_k": 10,
+            "message": "Tell me about investment options",
+            "conversationHistory": "",
+            "top_k": 5,
         }
 
-        response = self.client.post("/query-with-rag", json=query_data)
-        assert response.status_code in [200, 503]
+        async with client.stream(
+            "POST", "/query-with-rag", json=query_data
+        ) as response:
+            assert response.status_code == 200
+
+            # Check that it's a streaming response with the SSE headers
+            headers = response.headers
+            assert headers["content-type"].startswith("text/event-stream")
+            assert {
+                "cache-control": "no-cache",
+                "connection": "keep-alive",
+                "access-control-allow-origin": "*",
+                "access-control-allow-headers": "*",
+            }.items() <= dict(headers).items()
+
+            # The first chunk is enough; no need to wait for the whole stream
+            async for chunk in response.aiter_bytes():
+                assert chunk
+                break
+
+    async def test_query_with_rag_empty_message(self, client):
+        """Test that empty messages are rejected."""
+        query_data = {"message": "", "conversationHistory": "", "top_k": 3}
+
+        response = await client.post("/query-with-rag", json=query_data)
+        assert response.status_code == 400
+        assert "empty" in response.json()["detail"].lower()
 
-    def test_query_with_rag_invalid_top_k(self):
-        """Test with invalid top_k values."""
-        # Test with negative top_k
-        query_data = {"message": "Test query", "top_k": -1}
+        # Test with whitespace-only message
+        query_data["message"] = "   "
+        response = await client.post("/query-with-rag", json=query_data)
+        assert response.status_code == 400
 
-        response = self.client.post("/query-with-rag", json=query_data)
-        # Should either work (if validation allows) or return 422
-        assert response.status_code in [200, 422, 503]
+    @pytest.mark.parametrize("top_k", [-1, 1000])
+    async def test_query_with_rag_invalid_top_k(self, client, top_k):
+        """Test with invalid top_k values."""
+        query_data = {"message": "Test query", "top_k": top_k}
 
-        # Test with very large top_k
-        query_data["top_k"] = 1000
-        response = self.client.post("/query-with-rag", json=query_data)
-        assert response.status_code in [200, 422, 503]
+        response = await client.post("/query-with-rag", json=query_data)
+        # QueryRequest does not range-check top_k
+        assert response.status_code == 200
 
-    def test_query_with_rag_long_message(self):
+    async def test_query_with_rag_long_message(self, client):
         """Test with a very long message."""
         query_data = {
-            "message": "A" * 10000,  # Very long message
+            "message": "A" * 128,  # Long message
             "conversationHistory": "",
             "top_k": 3,
         }
 
-        response = self.client.post("/query-with-rag", json=query_data)
-        # Should either work or return an appropriate error
-        assert response.status_code in [200, 400, 422, 503]
+        response = await client.post("/query-with-rag", json=query_data)
+        assert response.status_code == 200
 
-    def test_query_with_rag_long_conversation_history(self):
+    async def test_query_with_rag_long_conversation_history(self, client):
         """Test with long conversation history."""
-        long_history = "User: " + "Question? " * 1000 + "\nAI: " + "Answer. " * 1000
+        long_history = "User: " + "Question? " * 20 + "\nAI: " + "Answer. " * 20
 
         query_data = {
             "message": "Follow-up question",
@@ -155,49 +185,50 @@ class TestClaudeRoutes:
             "top_k": 3,
         }
 
-        response = self.client.post("/query-with-rag", json=query_data)
-        assert response.status_code in [200, 400, 422, 503]
+        response = await client.post("/query-with-rag", json=query_data)
+        assert response.status_code == 200
 
-    def test_query_with_rag_special_characters(self):
-        """Test with special characters in message."""
-        special_messages = [
+    @pytest.mark.parametrize(
+        "message",
+        [
             "What about émojis? 🤔💰📈",
             'Question with quotes: "What\'s the best strategy?"',
             "Math symbols: α + β = γ, ∑, ∆",
             "Mixed languages: 投資戦略について教えて",
             "Code snippet: `SELECT * FROM investments WHERE risk < 0.5`",
-        ]
-
-        for message in special_messages:
-            query_data = {"message": message, "conversationHistory": "", "top_k": 3}
+        ],
+    )
+    async def test_query_with_rag_special_characters(self, client, message):
+        """Test with special characters in message."""
+        query_data = {"message": message, "conversationHistory": "", "top_k": 3}
 
-            response = self.client.post("/query-with-rag", json=query_data)
-            # Should handle special characters gracefully
-            assert response.status_code in [200, 503]
+        response = await client.post("/query-with-rag", json=query_data)
+        # Should handle special characters gracefully
+        assert response.status_code == 200
 
-    def test_query_with_rag_json_structure(self):
+    async def test_query_with_rag_json_structure(self, client):
         """Test that invalid JSON structure is rejected."""
         # Test with invalid JSON
-        response = self.client.post(
+        response = await client.post(
             "/query-with-rag",
-            data="invalid json",
+            content="invalid json",
             headers={"content-type": "application/json"},
         )
         assert response.status_code == 422
 
-    def test_query_with_rag_content_type(self):
+    async def test_query_with_rag_content_type(self, client):
         """Test that correct content type is required."""
         query_data = {"message": "Test query", "conversationHistory": "", "top_k": 3}
 
         # Test with wrong content type
-        response = self.client.post(
+        response = await client.post(
             "/query-with-rag",
-            data=json.dumps(query_data),
+            content=orjson.dumps(query_data),
             headers={"content-type": "text/plain"},
         )
         assert response.status_code == 422
 
-    def test_query_with_rag_response_format(self):
+    async def test_query_with_rag_response_format(self, client):
         """Test the response format when successful."""
         query_data = {
             "message": "What is portfolio diversification?",
@@ -205,68 +236,56 @@ class TestClaudeRoutes:
             "top_k": 3,
         }
 
-        response = self.client.post("/query-with-rag", json=query_data)
+        response = await client.post("/query-with-rag", json=query_data)
+        assert response.status_code == 200
 
-        if response.status_code == 200:
-            # Should be streaming response
-            assert response.headers.get("content-type") == "text/event-stream"
+        # Should be streaming response
+        assert response.headers["content-type"].startswith("text/event-stream")
 
-            # Content should be server-sent events format
-            content = response.content.decode()
-            if content:
-                # Should contain SSE data
-                assert "data:" in content or len(content) > 0
+        # Content should be server-sent events format
+        events = response.content.decode().split("\n\n")
+        assert [
+            orjson.loads(event.removeprefix("data: ")) for event in events if event
+        ] == [
+            {"type": "content", "text": "Test answer"},
+            {"type": "done"},
+        ]
 
-    def test_multiple_concurrent_requests(self):
-        """Test that multiple requests can be handled."""
+    async def test_multiple_concurrent_requests(self, client):
+        """Test that multiple requests can be handled concurrently."""
         query_data = {
             "message": "Quick test query",
             "conversationHistory": "",
             "top_k": 1,
         }
 
-        # Make multiple requests
-        responses = []
-        for i in range(3):
-            response = self.client.post("/query-with-rag", json=query_data)
-            responses.append(response)
+        responses = await asyncio.gather(
+            *(client.post("/query-with-rag", json=query_data) for _ in range(3))
+        )
 
-        # All should return valid status codes
+        # All should succeed
         for response in responses:
-            assert response.status_code in [200, 503]
+            assert response.status_code == 200
 
-    def test_route_path_is_correct(self):
+    async def test_route_path_is_correct(self, client):
         """Test that the route path is correctly configured."""
-        # Test that the endpoint exists at the expected path
-        query_data = {"message": "test"}
-
         # Correct path should work
-        response = self.client.post("/query-with-rag", json=query_data)
-        assert response.status_code != 404
-
-        # Wrong path should return 404
-        response = self.client.post("/query-rag", json=query_data)
-        assert response.status_code == 404
-
-        response = self.client.post("/query", json=query_data)
-        assert response.status_code == 404
-
-    def test_http_methods(self):
-        """Test that only POST method is allowed."""
-        # POST should work (or return 503 if initializing)
-        response = self.client.post("/query-with-rag", json={"message": "test"})
-        assert response.status_code in [200, 503, 422]
-
-        # Other methods should not be allowed
-        response = self.client.get("/query-with-rag")
-        assert response.status_code == 405  # Method Not Allowed
-
-        response = self.client.put("/query-with-rag", json={"message": "test"})
-        assert response.status_code == 405
-
-        response = self.client.delete("/query-with-rag")
-        assert response.status_code == 405
-
-
-if __name__ == "__main__":
-    pytest.main([__file__])
+        response = await client.post("/query-with-rag", json={"message": "test"})
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize(
+        "method,path,expected",
+        [
+            # Similar but wrong paths
+            ("POST", "/query-rag", 404),
+            ("POST", "/query", 404),
+            # Only POST is allowed
+            ("GET", "/query-with-rag", 405),
+            ("PUT", "/query-with-rag", 405),
+            ("DELETE", "/query-with-rag", 405),
+        ],
+    )
+    async def test_routing(self, client, method, path, expected):
+        """Test that wrong paths and methods are rejected."""
+        response = await client.request(method, path, json={"message": "test"})
+        assert response.status_code == expected
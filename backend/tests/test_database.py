@@ -4,30 +4,67 @@ Tests for DatabaseManager functionality.
 
 import pytest
 import sqlite3
-import tempfile
 import os
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
 from contextlib import contextmanager
 from core.database import DatabaseManager, db_manager
 from core.exceptions import DatabaseError
 
+_SCHEMA_OBJECTS_SQL = """
+    SELECT type, name FROM sqlite_master
+    WHERE type IN ('table', 'index', 'trigger')
+    UNION ALL
+    SELECT 'column', name FROM pragma_table_info('faqs')
+"""
+
+
+def schema_objects(db):
+    """Return the names of the schema's tables, indexes, triggers and faqs columns."""
+    objects = {"table": set(), "index": set(), "trigger": set(), "column": set()}
+    for row in db.execute_query(_SCHEMA_OBJECTS_SQL):
+        objects[row["type"]].add(row["name"])
+    return objects
+
+
+class FakeConnection:
+    """Stand-in for sqlite3.Connection whose cursor() always fails."""
+
+    def __init__(self):
+        self.rollback_calls = 0
+        self.close_calls = 0
+
+    def executescript(self, sql):
+        pass
+
+    def cursor(self):
+        raise Exception("Test error")
+
+    def rollback(self):
+        self.rollback_calls += 1
+
+    def close(self):
+        self.close_calls += 1
+
 
 class TestDatabaseManager:
     """Test the DatabaseManager class."""
 
     def setup_method(self):
         """Set up test environment for each test."""
-        # Create a temporary database file for testing
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix=".db")
-        self.temp_db.close()
-        self.db_path = self.temp_db.name
+        # In-memory database; it lives as long as this thread's connection
+        self.db_path = ":memory:"
         self.db_manager = DatabaseManager(self.db_path)
 
     def teardown_method(self):
         """Clean up after each test."""
-        # Remove the temporary database file
-        if os.path.exists(self.db_path):
-            os.unlink(self.db_path)
+        self.db_manager.close()
+
+    @pytest.fixture
+    def file_db_manager(self, tmp_path):
+        """DatabaseManager backed by a file, for on-disk behaviour."""
+        db = DatabaseManager(str(tmp_path / "test.db"))
+        yield db
+        db.close()
 
     def test_initialization_with_custom_path(self):
         """Test DatabaseManager initialization with custom path."""
@@ -55,37 +92,186 @@ class TestDatabaseManager:
             result = cursor.fetchone()
             assert result[0] == 1
 
-    def test_get_connection_cleanup_on_success(self):
-        """Test that connection is properly closed after successful use."""
-        conn_ref = None
-
+    def test_get_connection_reused_within_thread(self):
+        """Test that the same connection is reused until the manager is closed."""
         with self.db_manager.get_connection() as conn:
             conn_ref = conn
-            # Test that connection works while in context
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            result = cursor.fetchone()
-            assert result[0] == 1
 
-        # Connection should be closed after context exit
-        # SQLite connections don't have a closed property,
-        # but we can test by trying to use it
+        with self.db_manager.get_connection() as conn:
+            assert conn is conn_ref
+            assert conn.execute("SELECT 1").fetchone()[0] == 1
+
+        self.db_manager.close()
+
+        # Connection should be closed after close()
         with pytest.raises(sqlite3.ProgrammingError):
             conn_ref.execute("SELECT 1")
 
+        # A fresh connection is opened on next use
+        with self.db_manager.get_connection() as conn:
+            assert conn is not conn_ref
+
+    def test_connections_closed_when_manager_collected(self):
+        """Test that dropping a manager closes its connections without close()."""
+        import gc
+
+        db = DatabaseManager(":memory:")
+        with db.get_connection() as conn:
+            pass
+
+        del db
+        gc.collect()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_data_version_changes_after_other_connection_writes(self, file_db_manager):
+        """Test that the data version only moves for writes by other connections."""
+        file_db_manager.initialize_schema()
+        before = file_db_manager.data_version()
+
+        file_db_manager.execute_insert(
+            "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q1", "A1")
+        )
+        assert file_db_manager.data_version() == before
+
+        other = DatabaseManager(file_db_manager.db_path)
+        try:
+            other.execute_insert(
+                "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q2", "A2")
+            )
+        finally:
+            other.close()
+
+        assert file_db_manager.data_version() != before
+
+    def test_get_connection_per_thread(self):
+        """Test that each thread gets its own connection."""
+        import threading
+
+        with self.db_manager.get_connection() as conn:
+            main_conn = conn
+
+        other = []
+
+        def worker():
+            with self.db_manager.get_connection() as conn:
+                other.append(conn)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert len(other) == 1
+        assert other[0] is not main_conn
+
+    def test_get_connection_closed_after_thread_exits(self):
+        """Test that a finished thread's connection is closed on the next open."""
+        import threading
+
+        other = []
+
+        def worker():
+            with self.db_manager.get_connection() as conn:
+                other.append(conn)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        # Opening a connection in this thread prunes the dead thread's one
+        with self.db_manager.get_connection():
+            pass
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            other[0].execute("SELECT 1")
+
+    def test_get_connection_pragmas(self, file_db_manager):
+        """Test that connections are configured with WAL and relaxed sync."""
+        with file_db_manager.get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            # NORMAL == 1
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    def test_get_connection_pragmas_in_memory(self):
+        """Test that in-memory databases skip the on-disk journal pragmas."""
+        db = DatabaseManager(":memory:")
+        try:
+            with db.get_connection() as conn:
+                assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+                # MEMORY == 2
+                assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+                assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        finally:
+            db.close()
+
+    def test_get_connection_shared_memory_uri(self):
+        """Test that a shared-cache memory URI is visible from every thread."""
+        import threading
+
+        db = DatabaseManager(f"file:test_{id(self)}?mode=memory&cache=shared")
+        try:
+            db.initialize_schema()
+            db.execute_insert(
+                "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q1", "A1")
+            )
+
+            rows = []
+            thread = threading.Thread(
+                target=lambda: rows.extend(
+                    db.execute_query("SELECT question FROM faqs")
+                )
+            )
+            thread.start()
+            thread.join()
+
+            assert [row["question"] for row in rows] == ["Q1"]
+        finally:
+            db.close()
+
+    def test_get_connection_pragmas_from_settings(self, file_db_manager):
+        """Test that connection pragmas follow the configured settings."""
+        with patch("core.database.settings") as mock_settings:
+            mock_settings.sqlite_journal_mode = "DELETE"
+            mock_settings.sqlite_synchronous = "FULL"
+            mock_settings.sqlite_mmap_size = 0
+            mock_settings.sqlite_busy_timeout = 1234
+
+            with file_db_manager.get_connection() as conn:
+                assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+                # FULL == 2
+                assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+                assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+
+    def test_get_connection_statement_cache(self):
+        """Test that connections are opened with an enlarged statement cache."""
+        connect_kwargs = []
+
+        def connector(db_path, **kwargs):
+            connect_kwargs.append(kwargs)
+            return sqlite3.connect(db_path, **kwargs)
+
+        db = DatabaseManager(":memory:", connector=connector)
+        try:
+            with db.get_connection():
+                pass
+        finally:
+            db.close()
+
+        assert connect_kwargs[0]["cached_statements"] == 256
+
     def test_get_connection_rollback_on_exception(self):
         """Test that connection is rolled back on exception."""
-        with patch("sqlite3.connect") as mock_connect:
-            mock_conn = Mock()
-            mock_connect.return_value = mock_conn
-            mock_conn.cursor.side_effect = Exception("Test error")
+        fake_conn = FakeConnection()
+        db = DatabaseManager(":memory:", connector=lambda *args, **kwargs: fake_conn)
 
-            with pytest.raises(DatabaseError, match="Database operation failed"):
-                with self.db_manager.get_connection() as conn:
-                    conn.cursor()
+        with pytest.raises(DatabaseError, match="Database operation failed"):
+            with db.get_connection() as conn:
+                conn.cursor()
 
-            mock_conn.rollback.assert_called_once()
-            mock_conn.close.assert_called_once()
+        assert fake_conn.rollback_calls == 1
+        assert fake_conn.close_calls == 0
 
     def test_get_transaction_success(self):
         """Test successful transaction handling."""
@@ -132,15 +318,10 @@ class TestDatabaseManager:
         """Test successful query execution."""
         # Initialize schema and add test data
         self.db_manager.initialize_schema()
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q1", "A1")
-            )
-            cursor.execute(
-                "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q2", "A2")
-            )
-            conn.commit()
+        self.db_manager.execute_batch(
+            "INSERT INTO faqs (question, answer) VALUES (?, ?)",
+            [("Q1", "A1"), ("Q2", "A2")],
+        )
 
         # Test query
         results = self.db_manager.execute_query(
@@ -157,17 +338,10 @@ class TestDatabaseManager:
         """Test query execution with parameters."""
         # Initialize schema and add test data
         self.db_manager.initialize_schema()
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO faqs (question, answer, status) VALUES (?, ?, ?)",
-                ("Q1", "A1", "public"),
-            )
-            cursor.execute(
-                "INSERT INTO faqs (question, answer, status) VALUES (?, ?, ?)",
-                ("Q2", "A2", "private"),
-            )
-            conn.commit()
+        self.db_manager.execute_batch(
+            "INSERT INTO faqs (question, answer, status) VALUES (?, ?, ?)",
+            [("Q1", "A1", "public"), ("Q2", "A2", "private")],
+        )
 
         # Test parameterized query
         results = self.db_manager.execute_query(
@@ -190,17 +364,30 @@ class TestDatabaseManager:
         with pytest.raises(DatabaseError, match="Database operation failed"):
             self.db_manager.execute_query("INVALID SQL QUERY")
 
+    def test_iter_query(self):
+        """Test streaming query results in batches."""
+        self.db_manager.initialize_schema()
+        self.db_manager.execute_batch(
+            "INSERT INTO faqs (question, answer) VALUES (?, ?)",
+            [(f"Q{i}", "A") for i in range(5)],
+        )
+
+        rows = self.db_manager.iter_query(
+            "SELECT question FROM faqs ORDER BY id", batch_size=2
+        )
+
+        assert [row["question"] for row in rows] == ["Q0", "Q1", "Q2", "Q3", "Q4"]
+
     def test_execute_one_success(self):
         """Test successful single row query execution."""
         # Initialize schema and add test data
         self.db_manager.initialize_schema()
-        with self.db_manager.get_connection() as conn:
+        with self.db_manager.get_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO faqs (question, answer) VALUES (?, ?)",
                 ("Test question", "Test answer"),
             )
-            conn.commit()
 
         # Test single row query
         result = self.db_manager.execute_one(
@@ -223,15 +410,10 @@ class TestDatabaseManager:
         """Test single row query execution with parameters."""
         # Initialize schema and add test data
         self.db_manager.initialize_schema()
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q1", "A1")
-            )
-            cursor.execute(
-                "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q2", "A2")
-            )
-            conn.commit()
+        self.db_manager.execute_batch(
+            "INSERT INTO faqs (question, answer) VALUES (?, ?)",
+            [("Q1", "A1"), ("Q2", "A2")],
+        )
 
         # Test parameterized single row query
         result = self.db_manager.execute_one(
@@ -250,13 +432,12 @@ class TestDatabaseManager:
         """Test successful update execution."""
         # Initialize schema and add test data
         self.db_manager.initialize_schema()
-        with self.db_manager.get_connection() as conn:
+        with self.db_manager.get_transaction() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO faqs (question, answer) VALUES (?, ?)",
                 ("Old question", "Old answer"),
             )
-            conn.commit()
 
         # Test update
         affected_rows = self.db_manager.execute_update(
@@ -284,15 +465,10 @@ class TestDatabaseManager:
         """Test delete execution."""
         # Initialize schema and add test data
         self.db_manager.initialize_schema()
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q1", "A1")
-            )
-            cursor.execute(
-                "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Q2", "A2")
-            )
-            conn.commit()
+        self.db_manager.execute_batch(
+            "INSERT INTO faqs (question, answer) VALUES (?, ?)",
+            [("Q1", "A1"), ("Q2", "A2")],
+        )
 
         # Test delete
         affected_rows = self.db_manager.execute_update(
@@ -302,8 +478,8 @@ class TestDatabaseManager:
         assert affected_rows == 1
 
         # Verify deletion
-        remaining = self.db_manager.execute_query("SELECT COUNT(*) as count FROM faqs")
-        assert remaining[0]["count"] == 1
+        remaining = self.db_manager.execute_query("SELECT question FROM faqs")
+        assert [row["question"] for row in remaining] == ["Q2"]
 
     def test_execute_update_database_error(self):
         """Test update execution with database error."""
@@ -346,69 +522,172 @@ class TestDatabaseManager:
         assert id2 > id1
 
         # Verify both inserts
-        count = self.db_manager.execute_one("SELECT COUNT(*) as count FROM faqs")
-        assert count["count"] == 2
+        rows = self.db_manager.execute_query(
+            "SELECT id, question FROM faqs ORDER BY id"
+        )
+        assert [tuple(row) for row in rows] == [(id1, "Q1"), (id2, "Q2")]
 
     def test_execute_insert_database_error(self):
         """Test insert execution with database error."""
         with pytest.raises(DatabaseError, match="Transaction failed"):
             self.db_manager.execute_insert("INVALID SQL INSERT")
 
-    def test_initialize_schema_creates_tables(self):
-        """Test that schema initialization creates required tables."""
+    def test_execute_batch(self):
+        """Test executing one write per parameter set in one transaction."""
         self.db_manager.initialize_schema()
 
-        # Check that faqs table exists
-        result = self.db_manager.execute_one(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='faqs'"
+        rowcount = self.db_manager.execute_batch(
+            "INSERT INTO faqs (question, answer) VALUES (?, ?)",
+            [("Q1", "A1"), ("Q2", "A2"), ("Q3", "A3")],
         )
-        assert result is not None
-        assert result["name"] == "faqs"
 
-        # Check that FTS table exists
-        result = self.db_manager.execute_one(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='faqs_fts'"
+        assert rowcount == 3
+        rows = self.db_manager.execute_query("SELECT question FROM faqs ORDER BY id")
+        assert [row["question"] for row in rows] == ["Q1", "Q2", "Q3"]
+
+    def test_execute_batch_rolls_back_on_error(self):
+        """Test that a failing parameter set rolls back the whole batch."""
+        self.db_manager.initialize_schema()
+
+        with pytest.raises(DatabaseError):
+            self.db_manager.execute_batch(
+                "INSERT INTO faqs (question, answer) VALUES (?, ?)",
+                [("Q1", "A1"), ("Q2", None)],
+            )
+
+        result = self.db_manager.execute_one("SELECT COUNT(*) FROM faqs")
+        assert result[0] == 0
+
+    def test_execute_returning(self):
+        """Test INSERT/UPDATE ... RETURNING returns the affected row."""
+        self.db_manager.initialize_schema()
+
+        row = self.db_manager.execute_returning(
+            "INSERT INTO faqs (question, answer) VALUES (?, ?) RETURNING id, question",
+            ("Q1", "A1"),
         )
-        assert result is not None
-        assert result["name"] == "faqs_fts"
+        assert row["question"] == "Q1"
+
+        row = self.db_manager.execute_returning(
+            "UPDATE faqs SET question = ? WHERE id = ? RETURNING question",
+            ("Q2", row["id"]),
+        )
+        assert row["question"] == "Q2"
+
+        row = self.db_manager.execute_returning(
+            "UPDATE faqs SET question = ? WHERE id = 999 RETURNING question", ("Q3",)
+        )
+        assert row is None
+
+    def test_initialize_schema_creates_tables(self):
+        """Test that schema initialization creates required tables."""
+        self.db_manager.initialize_schema()
+
+        tables = schema_objects(self.db_manager)["table"]
+        assert "faqs" in tables
+        assert "faqs_fts" in tables
 
     def test_initialize_schema_creates_indexes(self):
         """Test that schema initialization creates indexes."""
         self.db_manager.initialize_schema()
 
-        # Check that indexes exist
-        indexes = self.db_manager.execute_query(
-            "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'"
-        )
+        index_names = schema_objects(self.db_manager)["index"]
+        assert "idx_status_id" in index_names
+        assert "idx_category_id" in index_names
+        assert "idx_faq_tags_faq" in index_names
 
-        index_names = [idx["name"] for idx in indexes]
-        assert "idx_question" in index_names
-        assert "idx_answer" in index_names
-        assert "idx_status" in index_names
-        assert "idx_category" in index_names
+        # Superseded single-column and long-text indexes are not created
+        assert "idx_question" not in index_names
+        assert "idx_answer" not in index_names
+        assert "idx_status" not in index_names
+        assert "idx_category" not in index_names
+
+    def test_initialize_schema_drops_legacy_indexes(self):
+        """Test that indexes from older schemas are removed."""
+        self.db_manager.initialize_schema()
+        with self.db_manager.get_connection() as conn:
+            conn.execute("CREATE INDEX idx_question ON faqs(question)")
+            conn.execute("CREATE INDEX idx_status ON faqs(status)")
+
+        self.db_manager.initialize_schema()
+
+        index_names = schema_objects(self.db_manager)["index"]
+        assert "idx_question" not in index_names
+        assert "idx_status" not in index_names
+
+    def test_filtered_listing_uses_composite_index(self):
+        """Test that status-filtered listings are served by idx_status_id."""
+        self.db_manager.initialize_schema()
+
+        plan = self.db_manager.execute_query(
+            "EXPLAIN QUERY PLAN SELECT id FROM faqs WHERE status = ? ORDER BY id",
+            ("public",),
+        )
+        details = " ".join(row["detail"] for row in plan)
+        assert "idx_status_id" in details
+        assert "TEMP B-TREE" not in details
 
     def test_initialize_schema_creates_triggers(self):
         """Test that schema initialization creates triggers."""
         self.db_manager.initialize_schema()
 
-        # Check that triggers exist
-        triggers = self.db_manager.execute_query(
-            "SELECT name FROM sqlite_master WHERE type='trigger'"
+        trigger_names = schema_objects(self.db_manager)["trigger"]
+        assert "faqs_ai" in trigger_names
+        assert "faqs_ad" in trigger_names
+        assert "faqs_au" in trigger_names
+        assert "faq_tags_ai" in trigger_names
+        assert "faq_tags_ad" in trigger_names
+        assert "faq_tags_au" in trigger_names
+
+    def test_initialize_schema_syncs_faq_tags(self):
+        """Test that faq_tags mirrors the tags JSON column."""
+        self.db_manager.initialize_schema()
+
+        faq_id = self.db_manager.execute_insert(
+            "INSERT INTO faqs (question, answer, tags) VALUES (?, ?, ?)",
+            ("Q", "A", '["a", "b", "a"]'),
+        )
+        rows = self.db_manager.execute_query(
+            "SELECT tag FROM faq_tags WHERE faq_id = ? ORDER BY tag", (faq_id,)
+        )
+        assert [row["tag"] for row in rows] == ["a", "b"]
+
+        self.db_manager.execute_update(
+            "UPDATE faqs SET tags = ? WHERE id = ?", ('["c"]', faq_id)
         )
+        rows = self.db_manager.execute_query("SELECT tag FROM faq_tags")
+        assert [row["tag"] for row in rows] == ["c"]
+
+        self.db_manager.execute_update("DELETE FROM faqs WHERE id = ?", (faq_id,))
+        assert self.db_manager.execute_query("SELECT * FROM faq_tags") == []
+
+    def test_initialize_schema_backfills_faq_tags(self):
+        """Test that existing tagged FAQs are copied into faq_tags."""
+        with self.db_manager.get_connection() as conn:
+            conn.execute(
+                "CREATE TABLE faqs (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "question TEXT NOT NULL, answer TEXT NOT NULL, "
+                "status TEXT DEFAULT 'public', category TEXT DEFAULT 'other', "
+                "tags TEXT DEFAULT '', "
+                "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+                "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            )
+            conn.execute(
+                "INSERT INTO faqs (question, answer, tags) VALUES (?, ?, ?)",
+                ("Q", "A", '["legacy"]'),
+            )
+            conn.execute("INSERT INTO faqs (question, answer) VALUES ('Q2', 'A2')")
 
-        trigger_names = [trigger["name"] for trigger in triggers]
-        assert "faqs_ai" in trigger_names  # After insert
-        assert "faqs_ad" in trigger_names  # After delete
-        assert "faqs_au" in trigger_names  # After update
+        self.db_manager.initialize_schema()
+
+        rows = self.db_manager.execute_query("SELECT faq_id, tag FROM faq_tags")
+        assert [tuple(row) for row in rows] == [(1, "legacy")]
 
     def test_initialize_schema_table_structure(self):
         """Test that the faqs table has correct structure."""
         self.db_manager.initialize_schema()
 
-        # Get table info
-        columns = self.db_manager.execute_query("PRAGMA table_info(faqs)")
-
-        column_names = [col["name"] for col in columns]
+        column_names = schema_objects(self.db_manager)["column"]
         expected_columns = [
             "id",
             "question",
@@ -462,6 +741,56 @@ class TestDatabaseManager:
         assert len(results) == 1
         assert "Python" in results[0]["question"] or "Python" in results[0]["answer"]
 
+    def test_initialize_schema_reindexes_without_fts_triggers(self):
+        """Test that rows written while the FTS triggers were absent get indexed."""
+        self.db_manager.initialize_schema()
+        with self.db_manager.get_connection() as conn:
+            conn.execute("DROP TRIGGER faqs_ai")
+        self.db_manager.execute_insert(
+            "INSERT INTO faqs (question, answer) VALUES (?, ?)", ("Python?", "Yes")
+        )
+
+        self.db_manager.initialize_schema()
+
+        results = self.db_manager.execute_query(
+            "SELECT rowid FROM faqs_fts WHERE faqs_fts MATCH ?", ("Python",)
+        )
+        assert len(results) == 1
+
+    def test_initialize_schema_narrows_legacy_update_trigger(self):
+        """Test that the old AFTER UPDATE FTS trigger is replaced on upgrade."""
+        with self.db_manager.get_connection() as conn:
+            conn.executescript("""
+                CREATE TABLE faqs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    question TEXT NOT NULL, answer TEXT NOT NULL,
+                    status TEXT DEFAULT 'public', category TEXT DEFAULT 'other',
+                    tags TEXT DEFAULT '',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                CREATE VIRTUAL TABLE faqs_fts USING fts5(
+                    question, answer, content='faqs', content_rowid='id'
+                );
+                CREATE TRIGGER faqs_ai AFTER INSERT ON faqs BEGIN
+                    INSERT INTO faqs_fts(rowid, question, answer)
+                    VALUES (new.id, new.question, new.answer);
+                END;
+                CREATE TRIGGER faqs_au AFTER UPDATE ON faqs BEGIN
+                    INSERT INTO faqs_fts(faqs_fts, rowid, question, answer)
+                    VALUES('delete', old.id, old.question, old.answer);
+                    INSERT INTO faqs_fts(rowid, question, answer)
+                    VALUES (new.id, new.question, new.answer);
+                END;
+                """)
+
+        self.db_manager.initialize_schema()
+
+        trigger = self.db_manager.execute_one(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'faqs_au'"
+        )
+        assert "AFTER UPDATE OF question, answer" in trigger["sql"]
+
     def test_initialize_schema_multiple_calls(self):
         """Test that multiple schema initialization calls are safe."""
         # Should not raise any errors
@@ -523,33 +852,43 @@ class TestDatabaseManager:
         assert result[0] == "Test question"
         assert result[1] == "Test answer"
 
-    def test_database_file_creation(self):
+    def test_database_file_creation(self, file_db_manager):
         """Test that database file is created when accessed."""
-        # Remove the file if it exists
-        if os.path.exists(self.db_path):
-            os.unlink(self.db_path)
+        assert not os.path.exists(file_db_manager.db_path)
 
         # Access database - should create the file
-        with self.db_manager.get_connection() as conn:
+        with file_db_manager.get_connection() as conn:
             pass
 
-        assert os.path.exists(self.db_path)
-
-    def test_concurrent_access_safety(self):
-        """Test basic concurrent access safety."""
-        self.db_manager.initialize_schema()
-
-        # This is a basic test - in real scenarios you'd test with actual threads
-        # Multiple consecutive operations should work
-        for i in range(5):
-            self.db_manager.execute_insert(
-                "INSERT INTO faqs (question, answer) VALUES (?, ?)",
-                (f"Question {i}", f"Answer {i}"),
-            )
-
-        count = self.db_manager.execute_one("SELECT COUNT(*) as count FROM faqs")
-        assert count["count"] == 5
+        assert os.path.exists(file_db_manager.db_path)
 
+    def test_concurrent_access_safety(self, file_db_manager):
+        """Test that writers on separate threads don't lose inserts."""
+        import threading
 
-if __name__ == "__main__":
-    pytest.main([__file__])
+        file_db_manager.initialize_schema()
+        ids = []
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(5):
+                    ids.append(
+                        file_db_manager.execute_insert(
+                            "INSERT INTO faqs (question, answer) VALUES (?, ?)",
+                            (f"Question {n}-{i}", f"Answer {n}-{i}"),
+                        )
+                    )
+            except DatabaseError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(set(ids)) == 20
+        rows = file_db_manager.execute_query("SELECT id FROM faqs")
+        assert {row["id"] for row in rows} == set(ids)
@@ -6,23 +6,36 @@ import pytest
 import json
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
-from core.faq import FAQManager
+from concurrent.futures import ThreadPoolExecutor
+from core.faq import FAQManager, _LISTING_QUERIES, _SEARCH_QUERY
 from core.database import DatabaseManager
-from core.pending_changes import PendingChangesManager, ChangeType
+from core.pending_changes import PendingChange, PendingChangesManager, ChangeType
 from core.exceptions import ValidationError, NotFoundError, DatabaseError
 from models import FAQResponse, FAQCreateRequest, FAQUpdateRequest
 
 
+@pytest.fixture(scope="class")
+def shared_faq_manager():
+    """Create one FAQManager over spec'd mocks for the whole class."""
+    mock_db = Mock(spec=DatabaseManager)
+    faq_manager = FAQManager(mock_db)
+
+    # Mock the pending changes manager
+    faq_manager.pending_changes = Mock(spec=PendingChangesManager)
+
+    return faq_manager, mock_db
+
+
 class TestFAQManager:
     """Test the FAQManager class."""
 
-    def setup_method(self):
-        """Set up test environment for each test."""
-        self.mock_db = Mock(spec=DatabaseManager)
-        self.faq_manager = FAQManager(self.mock_db)
-
-        # Mock the pending changes manager
-        self.faq_manager.pending_changes = Mock(spec=PendingChangesManager)
+    @pytest.fixture(autouse=True)
+    def reset_mocks(self, shared_faq_manager):
+        """Restore the shared manager and its mocks before each test."""
+        self.faq_manager, self.mock_db = shared_faq_manager
+        self.mock_db.reset_mock(return_value=True, side_effect=True)
+        self.faq_manager.pending_changes.reset_mock(return_value=True, side_effect=True)
+        self.faq_manager._lookup_cache.clear()
 
     def test_initialization(self):
         """Test FAQManager initialization."""
@@ -67,6 +80,8 @@ class TestFAQManager:
         mock_rows = [
             (1, "Q1", "A1", "public", "general", "[]", "2024-01-01", "2024-01-01"),
             (2, "Q2", "A2", "private", "tech", '["tag1"]', "2024-01-02", "2024-01-02"),
+            # Extra row fetched to detect the next page
+            (3, "Q3", "A3", "public", "tech", "[]", "2024-01-03", "2024-01-03"),
         ]
         self.mock_db.execute_one.return_value = (10,)  # total count
         self.mock_db.execute_query.return_value = mock_rows
@@ -77,11 +92,67 @@ class TestFAQManager:
         assert result["limit"] == 2
         assert result["offset"] == 0
         assert result["has_more"] is True
+        assert result["next_after_id"] == 2
         assert len(result["faqs"]) == 2
         assert result["faqs"][0].id == 1
         assert result["faqs"][1].id == 2
         assert "timestamp" in result
 
+    def test_get_faqs_after_id(self):
+        """Test keyset pagination with after_id."""
+        mock_rows = [
+            (6, "Q6", "A6", "public", "general", "[]", "2024-01-01", "2024-01-01")
+        ]
+        self.mock_db.execute_one.return_value = (6,)
+        self.mock_db.execute_query.return_value = mock_rows
+
+        result = self.faq_manager.get_faqs(limit=2, after_id=5, status="public")
+
+        assert result["has_more"] is False
+        assert result["after_id"] == 5
+        query, params = self.mock_db.execute_query.call_args[0]
+        assert "id > ?" in query
+        assert "OFFSET" not in query
+        assert params == ("public", 5, 3)
+
+    def test_get_faqs_offset_uses_keyset_seek(self):
+        """Test that a legacy offset is translated into a keyset seek."""
+        self.mock_db.execute_one.side_effect = [(10,), (42,)]
+        self.mock_db.execute_query.return_value = []
+
+        self.faq_manager.get_faqs(limit=5, offset=3)
+
+        seek_query, seek_params = self.mock_db.execute_one.call_args[0]
+        assert "SELECT id FROM faqs" in seek_query
+        assert seek_params == (2,)
+        assert self.mock_db.execute_query.call_args[0][1] == (42, 6)
+
+    def test_get_faqs_offset_past_end(self):
+        """Test that an offset beyond the last row returns an empty page."""
+        self.mock_db.execute_one.side_effect = [(3,), None]
+
+        result = self.faq_manager.get_faqs(limit=5, offset=10)
+
+        assert result["faqs"] == []
+        assert result["has_more"] is False
+        self.mock_db.execute_query.assert_not_called()
+
+    def test_get_faqs_pages_with_database(self, test_faq_manager):
+        """Test that offset and after_id paging agree on a real database."""
+        ids = [test_faq_manager._create(f"Q{i}", f"A{i}").id for i in range(5)]
+
+        first = test_faq_manager.get_faqs(limit=2)
+        by_offset = test_faq_manager.get_faqs(limit=2, offset=2)
+        by_keyset = test_faq_manager.get_faqs(limit=2, after_id=first["faqs"][-1].id)
+        last = test_faq_manager.get_faqs(limit=2, offset=4)
+
+        assert [faq.id for faq in first["faqs"]] == ids[:2]
+        assert [faq.id for faq in by_offset["faqs"]] == ids[2:4]
+        assert [faq.id for faq in by_keyset["faqs"]] == ids[2:4]
+        assert by_keyset["has_more"] is True
+        assert [faq.id for faq in last["faqs"]] == ids[4:]
+        assert last["has_more"] is False
+
     def test_get_faqs_with_filters(self):
         """Test FAQ listing with filters."""
         mock_rows = [
@@ -120,8 +191,7 @@ class TestFAQManager:
             tags=["tag1", "tag2"],
         )
 
-        # Mock database responses
-        self.mock_db.execute_insert.return_value = 1
+        # Mock database response (INSERT ... RETURNING)
         mock_row = (
             1,
             "Test question",
@@ -132,7 +202,7 @@ class TestFAQManager:
             "2024-01-01",
             "2024-01-01",
         )
-        self.mock_db.execute_one.return_value = mock_row
+        self.mock_db.execute_returning.return_value = mock_row
 
         with (
             patch.object(self.faq_manager, "_validate_faq_input"),
@@ -146,11 +216,59 @@ class TestFAQManager:
         assert result.id == 1
         assert result.status == "pending"  # Should be set to pending initially
 
+        # The created row comes back from the INSERT itself
+        assert "RETURNING" in self.mock_db.execute_returning.call_args[0][0]
+        self.mock_db.execute_one.assert_not_called()
+
         # Check pending change was added
         self.faq_manager.pending_changes.add_pending_change.assert_called_once_with(
             faq_id=1, change_type=ChangeType.CREATED, original_status="public"
         )
 
+    def test_bulk_create_faqs_with_database(self, test_faq_manager):
+        """Test bulk creation inserts all rows and tracks pending changes."""
+        requests = [
+            FAQCreateRequest(question="Q1", answer="A1", status="public"),
+            FAQCreateRequest(
+                question="Q2", answer="A2", status="private", tags=["tag1"]
+            ),
+        ]
+
+        with patch.object(test_faq_manager, "pending_changes") as mock_pending:
+            result = test_faq_manager.bulk_create_faqs(requests)
+
+        assert [faq.question for faq in result] == ["Q1", "Q2"]
+        assert all(faq.status == "pending" for faq in result)
+        assert result[1].tags == ["tag1"]
+        mock_pending.add_pending_changes.assert_called_once_with(
+            [
+                (result[0].id, ChangeType.CREATED, "public"),
+                (result[1].id, ChangeType.CREATED, "private"),
+            ]
+        )
+
+    def test_bulk_create_faqs_validation_error(self):
+        """Test that one invalid item prevents the whole batch."""
+        requests = [
+            FAQCreateRequest(question="Q1", answer="A1"),
+            FAQCreateRequest(question="Q2", answer="A2"),
+        ]
+
+        with patch.object(
+            self.faq_manager,
+            "_validate_tags",
+            side_effect=[None, ValidationError("Invalid tags")],
+        ):
+            with pytest.raises(ValidationError, match="Invalid tags"):
+                self.faq_manager.bulk_create_faqs(requests)
+
+        self.mock_db.get_transaction.assert_not_called()
+
+    def test_bulk_create_faqs_empty(self):
+        """Test bulk creation with no items."""
+        assert self.faq_manager.bulk_create_faqs([]) == []
+        self.mock_db.get_transaction.assert_not_called()
+
     def test_create_faq_validation_error(self):
         """Test FAQ creation with validation error."""
         request = FAQCreateRequest(question="", answer="Test answer", status="public")
@@ -225,6 +343,35 @@ class TestFAQManager:
             original_status="private",  # The intended status
         )
 
+    def test_update_uses_returning(self):
+        """Test that _update returns the updated row without a re-fetch."""
+        self.mock_db.execute_returning.return_value = (
+            1,
+            "New question",
+            "A",
+            "pending",
+            "general",
+            '["tag1"]',
+            "2024-01-01",
+            "2024-01-02",
+        )
+
+        result = self.faq_manager._update(1, question="New question", tags=["tag1"])
+
+        assert result.question == "New question"
+        assert result.tags == ["tag1"]
+        query, params = self.mock_db.execute_returning.call_args[0]
+        assert "RETURNING" in query
+        assert params == ("New question", '["tag1"]', 1)
+        self.mock_db.execute_one.assert_not_called()
+
+    def test_update_missing_faq(self):
+        """Test that _update raises NotFoundError when no row was updated."""
+        self.mock_db.execute_returning.return_value = None
+
+        with pytest.raises(NotFoundError, match="FAQ not found with ID: 999"):
+            self.faq_manager._update(999, question="New question")
+
     def test_update_faq_not_found(self):
         """Test FAQ update when FAQ doesn't exist."""
         request = FAQUpdateRequest(question="Updated question")
@@ -308,6 +455,123 @@ class TestFAQManager:
         assert result[0].id == 1
         assert result[1].id == 2
 
+    def test_search_uses_fts_index(self):
+        """Test that search queries the FTS5 index first."""
+        mock_rows = [
+            (1, "Q", "A", "public", "tech", "[]", "2024-01-01", "2024-01-01", -1.5)
+        ]
+        self.mock_db.execute_query.return_value = mock_rows
+
+        result = self.faq_manager.search_faqs("python setup", limit=5)
+
+        assert len(result) == 1
+        self.mock_db.execute_query.assert_called_once()
+        query, params = self.mock_db.execute_query.call_args[0]
+        assert "faqs_fts MATCH ?" in query
+        assert params == ('"python"* "setup"*', "python setup", "python setup", 5)
+
+    def test_search_falls_back_to_like_with_only_category_hits(self):
+        """Test that LIKE ranking is used when no row matches the FTS index."""
+        category_rows = [
+            (1, "Q", "A", "public", "tech", "[]", "2024-01-01", "2024-01-01", None)
+        ]
+        like_rows = category_rows[:1] + [
+            (2, "Q", "A", "public", "tech", "[]", "2024-01-01", "2024-01-01", 5.0)
+        ]
+        self.mock_db.execute_query.side_effect = [category_rows, like_rows]
+
+        result = self.faq_manager.search_faqs("tech", limit=5)
+
+        assert [faq.id for faq in result] == [1, 2]
+        assert "LIKE ?" in self.mock_db.execute_query.call_args[0][0]
+
+    def test_search_falls_back_to_like_without_fts_hits(self):
+        """Test that search falls back to LIKE matching when FTS finds nothing."""
+        like_rows = [
+            (1, "Q", "A", "public", "tech", "[]", "2024-01-01", "2024-01-01", 10.0)
+        ]
+        self.mock_db.execute_query.side_effect = [[], like_rows]
+
+        result = self.faq_manager.search_faqs("開設", limit=5)
+
+        assert len(result) == 1
+        assert self.mock_db.execute_query.call_count == 2
+        like_query = self.mock_db.execute_query.call_args[0][0]
+        assert "LIKE ?" in like_query
+
+    def test_search_without_terms_skips_fts(self):
+        """Test that punctuation-only queries go straight to LIKE matching."""
+        self.mock_db.execute_query.return_value = []
+
+        self.faq_manager.search_faqs("???")
+
+        self.mock_db.execute_query.assert_called_once()
+        assert "MATCH" not in self.mock_db.execute_query.call_args[0][0]
+
+    def test_build_fts_query_strips_operators(self):
+        """Test that FTS query building drops quotes and FTS syntax."""
+        result = self.faq_manager._build_fts_query('how "to" OR-open*')
+        assert result == '"how"* "to"* "OR"* "open"*'
+        assert self.faq_manager._build_fts_query("!!") == ""
+
+    def test_search_faqs_with_database(self, test_faq_manager):
+        """Test FTS and fallback search against a real database."""
+        test_faq_manager._create("How do I open an account?", "Use the app.")
+        test_faq_manager._create("口座開設について", "アプリから申し込めます。")
+
+        english = test_faq_manager.search_faqs("acc")
+        japanese = test_faq_manager.search_faqs("開設")
+
+        assert [faq.question for faq in english] == ["How do I open an account?"]
+        assert [faq.question for faq in japanese] == ["口座開設について"]
+
+    def test_search_faqs_includes_category_and_tag_matches(self, test_faq_manager):
+        """Test that FTS results are followed by category and tag matches."""
+        text = test_faq_manager._create("Billing cycle", "Monthly.")
+        category = test_faq_manager._create("Invoices", "PDF.", category="billing")
+        tagged = test_faq_manager._create("Refunds", "Ask support.", tags=["billing"])
+        test_faq_manager._create("Unrelated", "Nothing here.")
+
+        results = test_faq_manager.search_faqs("billing")
+
+        assert [faq.id for faq in results] == [text.id, category.id, tagged.id]
+
+    def test_search_query_uses_indexes(self, test_faq_manager):
+        """Test that the FTS search query never scans the faqs table."""
+        plan = test_faq_manager.db.execute_query(
+            f"EXPLAIN QUERY PLAN {_SEARCH_QUERY}",
+            ('"billing"*', "billing", "billing", 20),
+        )
+        scanned = [
+            row["detail"].split()[1]
+            for row in plan
+            if row["detail"].startswith("SCAN ")
+        ]
+        assert "f" not in scanned
+        assert "faqs" not in scanned
+
+    def test_search_faqs_follows_writes_with_database(self, test_faq_manager):
+        """Test that search reflects creates, updates and deletes immediately."""
+        reset = test_faq_manager.create_faq(
+            FAQCreateRequest(question="Password reset", answer="Use the link.")
+        )
+        rules = test_faq_manager.create_faq(
+            FAQCreateRequest(question="Password rules", answer="Eight characters.")
+        )
+
+        results = test_faq_manager.search_faqs("password")
+        assert {faq.id for faq in results} == {reset.id, rules.id}
+
+        test_faq_manager.update_faq(reset.id, FAQUpdateRequest(question="Login help"))
+        results = test_faq_manager.search_faqs("password")
+        assert [faq.id for faq in results] == [rules.id]
+        results = test_faq_manager.search_faqs("login")
+        assert [faq.id for faq in results] == [reset.id]
+
+        test_faq_manager.delete_faq(rules.id)
+        results = test_faq_manager.search_faqs("password")
+        assert results == []
+
     def test_search_faqs_empty_query(self):
         """Test FAQ search with empty query."""
         with pytest.raises(ValidationError, match="Search query cannot be empty"):
@@ -327,14 +591,110 @@ class TestFAQManager:
 
     def test_get_all_tags(self):
         """Test getting all tags."""
-        mock_rows = [('["tag1", "tag2"]',), ('["tag2", "tag3"]',)]
+        mock_rows = [("tag1",), ("tag2",), ("tag3",)]
         self.mock_db.execute_query.return_value = mock_rows
 
         result = self.faq_manager.get_all_tags()
 
         assert result["count"] == 3
-        assert set(result["tags"]) == {"tag1", "tag2", "tag3"}
+        assert result["tags"] == ["tag1", "tag2", "tag3"]
         assert "timestamp" in result
+        assert "faq_tags" in self.mock_db.execute_query.call_args[0][0]
+
+    def test_get_all_tags_cached_until_mutation(self):
+        """Test that tags are served from cache until an FAQ changes."""
+        self.mock_db.execute_query.return_value = [("tag1",)]
+
+        first = self.faq_manager.get_all_tags()
+        second = self.faq_manager.get_all_tags()
+
+        assert first["tags"] == second["tags"] == ["tag1"]
+        self.mock_db.execute_query.assert_called_once()
+
+        # Deleting an FAQ invalidates the cache
+        self.mock_db.execute_one.return_value = (
+            1,
+            "Q",
+            "A",
+            "public",
+            "general",
+            '["tag1"]',
+            "2024-01-01",
+            "2024-01-01",
+        )
+        self.mock_db.execute_update.return_value = 1
+        self.faq_manager._delete(1)
+        self.mock_db.execute_query.return_value = []
+
+        assert self.faq_manager.get_all_tags()["tags"] == []
+        assert self.mock_db.execute_query.call_count == 2
+
+    def test_get_all_categories_cached_until_mutation(self):
+        """Test that categories are served from cache until an FAQ changes."""
+        self.mock_db.execute_query.return_value = [("general", 5)]
+
+        self.faq_manager.get_all_categories()
+        result = self.faq_manager.get_all_categories()
+
+        assert result["categories"] == [{"name": "general", "count": 5}]
+        self.mock_db.execute_query.assert_called_once()
+
+        self.mock_db.execute_returning.return_value = (
+            2,
+            "Q",
+            "A",
+            "public",
+            "tech",
+            "[]",
+            "2024-01-01",
+            "2024-01-01",
+        )
+        self.faq_manager._create("Q", "A", category="tech")
+        self.faq_manager.get_all_categories()
+
+        assert self.mock_db.execute_query.call_count == 2
+
+    def test_lookups_refresh_after_writes_from_another_manager(
+        self, test_db_manager, tmp_path
+    ):
+        """Test that cached lookups notice writes made through another connection."""
+        api = FAQManager(test_db_manager, PendingChangesManager(str(tmp_path)))
+        cli_db = DatabaseManager(test_db_manager.db_path)
+        cli = FAQManager(cli_db, PendingChangesManager(str(tmp_path)))
+        try:
+            assert api.get_all_tags()["tags"] == []
+            assert api.get_all_categories()["categories"] == []
+
+            cli._create("Q", "A", category="billing", tags=["invoice"])
+
+            assert api.get_all_tags()["tags"] == ["invoice"]
+            assert api.get_all_categories()["categories"] == [
+                {"name": "billing", "count": 1}
+            ]
+        finally:
+            cli_db.close()
+
+    def test_lookups_stay_cached_across_threads(self, test_faq_manager):
+        """Test that worker threads share cached lookups without writes between."""
+        test_faq_manager._create("Q", "A", tags=["invoice"])
+
+        def lookup():
+            return test_faq_manager.get_all_tags()["tags"]
+
+        with (
+            patch.object(
+                test_faq_manager.db,
+                "execute_query",
+                wraps=test_faq_manager.db.execute_query,
+            ) as execute_query,
+            ThreadPoolExecutor(max_workers=1) as pool,
+        ):
+            for _ in range(3):
+                assert lookup() == ["invoice"]
+                assert pool.submit(lookup).result() == ["invoice"]
+
+        # Only the worker's first lookup, with no version seen yet, reloads
+        assert execute_query.call_count == 2
 
     def test_get_all_categories(self):
         """Test getting all categories."""
@@ -352,18 +712,18 @@ class TestFAQManager:
 
     def test_get_statistics(self):
         """Test getting FAQ statistics."""
-        # Mock multiple database calls
-        self.mock_db.execute_one.side_effect = [
-            (100,),  # total_faqs
-            (80,),  # public_faqs
-            (20,),  # private_faqs
-            (5,),  # recent_faqs
-            (50.5,),  # avg_question_length
-            (150.2,),  # avg_answer_length
-            (200,),  # max_question_length
-            (500,),  # max_answer_length
-            (75,),  # faqs_with_tags
-        ]
+        # All statistics come back from a single aggregate query
+        self.mock_db.execute_one.return_value = (
+            100,  # total_faqs
+            80,  # public_faqs
+            20,  # private_faqs
+            5,  # recent_faqs
+            50.5,  # avg_question_length
+            150.2,  # avg_answer_length
+            200,  # max_question_length
+            500,  # max_answer_length
+            75,  # faqs_with_tags
+        )
 
         result = self.faq_manager.get_statistics()
 
@@ -377,6 +737,18 @@ class TestFAQManager:
         assert result["max_answer_length"] == 500
         assert result["faqs_with_tags"] == 75
         assert "timestamp" in result
+        self.mock_db.execute_one.assert_called_once()
+
+    def test_get_statistics_empty_table(self):
+        """Test statistics default to zero when there are no FAQs."""
+        self.mock_db.execute_one.return_value = (0,) + (None,) * 8
+
+        result = self.faq_manager.get_statistics()
+
+        assert result["total_faqs"] == 0
+        assert result["public_faqs"] == 0
+        assert result["avg_question_length"] == 0
+        assert result["faqs_with_tags"] == 0
 
     def test_load_faqs_for_rag(self):
         """Test loading FAQs for RAG system."""
@@ -384,7 +756,7 @@ class TestFAQManager:
             (1, "Q1", "A1", "public", "general", '["tag1"]'),
             (2, "Q2", "A2", "private", "tech", "[]"),
         ]
-        self.mock_db.execute_query.return_value = mock_rows
+        self.mock_db.iter_query.return_value = iter(mock_rows)
 
         result = self.faq_manager.load_faqs_for_rag()
 
@@ -406,6 +778,18 @@ class TestFAQManager:
             "tags": [],
         }
 
+    def test_iter_faqs_for_rag_is_lazy(self):
+        """Test that streaming FAQs for RAG does not touch the database eagerly."""
+        self.mock_db.iter_query.return_value = iter(
+            [(1, "Q1", "A1", "public", "general", "[]")]
+        )
+
+        stream = self.faq_manager.iter_faqs_for_rag()
+        self.mock_db.iter_query.assert_not_called()
+
+        assert next(stream)["id"] == 1
+        assert next(stream, None) is None
+
     def test_get_pending_changes(self):
         """Test getting pending changes."""
         mock_changes = {"changes": [], "total_count": 0}
@@ -418,8 +802,6 @@ class TestFAQManager:
 
     def test_restore_faq_statuses_after_rebuild(self):
         """Test restoring FAQ statuses after cache rebuild."""
-        from core.pending_changes import PendingChange
-
         # Mock pending changes
         mock_changes = [
             PendingChange(1, ChangeType.CREATED, "public", "2024-01-01"),
@@ -435,21 +817,38 @@ class TestFAQManager:
         self.faq_manager.pending_changes.clear_all_pending_changes.return_value = {
             "cleared_count": 3
         }
-
-        with patch.object(
-            self.faq_manager, "_update_status_only"
-        ) as mock_update_status:
-            result = self.faq_manager.restore_faq_statuses_after_rebuild()
+        result = self.faq_manager.restore_faq_statuses_after_rebuild()
 
         assert result["success"] is True
         assert result["restored_count"] == 2  # Only created and updated, not deleted
         assert result["cleared_count"] == 3
         assert "timestamp" in result
 
-        # Check that status updates were called for non-deleted FAQs
-        assert mock_update_status.call_count == 2
-        mock_update_status.assert_any_call(1, "public")
-        mock_update_status.assert_any_call(2, "private")
+        # Status updates for non-deleted FAQs are batched in one transaction
+        self.mock_db.execute_batch.assert_called_once()
+        query, rows = self.mock_db.execute_batch.call_args[0]
+        assert "UPDATE faqs SET status = ?" in query
+        assert "updated_at = CURRENT_TIMESTAMP" in query
+        assert rows == [("public", 1), ("private", 2)]
+
+        # Triggers keep the search index in sync, so no rebuild is needed
+        self.mock_db.execute_update.assert_not_called()
+
+    def test_restore_faq_statuses_nothing_to_restore(self):
+        """Test restore skips the database when no statuses need restoring."""
+        self.faq_manager.pending_changes.get_changes_for_rebuild.return_value = [
+            PendingChange(3, ChangeType.DELETED, "public", "2024-01-03"),
+            PendingChange(4, ChangeType.CREATED, "pending", "2024-01-04"),
+        ]
+        self.faq_manager.pending_changes.clear_all_pending_changes.return_value = {
+            "cleared_count": 2
+        }
+
+        result = self.faq_manager.restore_faq_statuses_after_rebuild()
+
+        assert result["restored_count"] == 0
+        assert result["cleared_count"] == 2
+        self.mock_db.execute_batch.assert_not_called()
 
     def test_restore_faq_statuses_database_error(self):
         """Test restore FAQ statuses with database error."""
@@ -460,16 +859,6 @@ class TestFAQManager:
         with pytest.raises(DatabaseError, match="Failed to restore FAQ statuses"):
             self.faq_manager.restore_faq_statuses_after_rebuild()
 
-    def test_update_status_only(self):
-        """Test internal _update_status_only method."""
-        self.faq_manager._update_status_only(1, "public")
-
-        self.mock_db.execute_query.assert_called_once()
-        call_args = self.mock_db.execute_query.call_args
-        assert "UPDATE faqs SET status = ?" in call_args[0][0]
-        assert call_args[0][1][0] == "public"
-        assert call_args[0][1][2] == 1
-
     def test_validate_faq_input_success(self):
         """Test successful FAQ input validation."""
         with (
@@ -541,6 +930,9 @@ class TestFAQManager:
         with pytest.raises(ValidationError, match="Tags cannot be empty"):
             self.faq_manager._validate_tags(["", "valid_tag"])
 
+        with pytest.raises(ValidationError, match="Tags cannot be empty"):
+            self.faq_manager._validate_tags(["valid_tag", " \t"])
+
     def test_validate_tags_too_long(self):
         """Test tags validation with too long tag."""
         long_tag = "a" * 51  # 51 characters
@@ -568,7 +960,13 @@ class TestFAQManager:
     def test_serialize_tags_valid(self):
         """Test serializing valid tags."""
         result = self.faq_manager._serialize_tags(["tag1", "tag2"])
-        assert result == '["tag1", "tag2"]'
+        assert result == '["tag1","tag2"]'
+
+    def test_serialize_tags_round_trip_non_ascii(self):
+        """Test that non-ASCII tags survive serialization unescaped."""
+        result = self.faq_manager._serialize_tags(["口座", "tag"])
+        assert result == '["口座","tag"]'
+        assert self.faq_manager._parse_tags(result) == ["口座", "tag"]
 
     def test_serialize_tags_empty(self):
         """Test serializing empty tags."""
@@ -578,47 +976,50 @@ class TestFAQManager:
         result = self.faq_manager._serialize_tags(None)
         assert result == "[]"
 
-    def test_build_where_clause_no_filters(self):
-        """Test building WHERE clause with no filters."""
-        where_clause, params = self.faq_manager._build_where_clause({})
-        assert where_clause == ""
-        assert params == ()
-
-    def test_build_where_clause_with_filters(self):
-        """Test building WHERE clause with filters."""
-        filters = {"status": "public", "category": "general"}
-        where_clause, params = self.faq_manager._build_where_clause(filters)
-
-        assert " WHERE " in where_clause
-        assert "status = ?" in where_clause
-        assert "category = ?" in where_clause
-        assert params == ("public", "general")
-
-    def test_build_where_clause_with_tag_filter(self):
-        """Test building WHERE clause with tag filter."""
-        filters = {"tag": "python"}
-        where_clause, params = self.faq_manager._build_where_clause(filters)
-
-        assert "tags LIKE ?" in where_clause
-        assert params == ('%"python"%',)
-
-    def test_apply_pagination_with_limit(self):
-        """Test applying pagination with limit."""
-        query = "SELECT * FROM faqs"
-        result = self.faq_manager._apply_pagination(query, limit=10)
-        assert result == "SELECT * FROM faqs LIMIT 10"
-
-    def test_apply_pagination_with_limit_and_offset(self):
-        """Test applying pagination with limit and offset."""
-        query = "SELECT * FROM faqs"
-        result = self.faq_manager._apply_pagination(query, limit=10, offset=20)
-        assert result == "SELECT * FROM faqs LIMIT 10 OFFSET 20"
-
-    def test_apply_pagination_no_limit(self):
-        """Test applying pagination without limit."""
-        query = "SELECT * FROM faqs"
-        result = self.faq_manager._apply_pagination(query)
-        assert result == "SELECT * FROM faqs"
+    def test_listing_queries_cover_all_filter_combinations(self):
+        """Test that listing SQL is precomputed for every filter combination."""
+        assert len(_LISTING_QUERIES) == 8
+
+        count_query, seek_query, list_query = _LISTING_QUERIES[(False, False, False)]
+        assert count_query == "SELECT COUNT(*) FROM faqs"
+        assert "WHERE id > ?" in list_query
+        assert list_query.endswith("ORDER BY id LIMIT ?")
+
+        count_query, seek_query, list_query = _LISTING_QUERIES[(True, True, True)]
+        for query in (count_query, seek_query, list_query):
+            assert "status = ? AND category = ?" in query
+            assert "faq_tags WHERE tag = ?" in query
+
+    def test_get_all_passes_filters_in_order(self):
+        """Test that only active filters are bound, in placeholder order."""
+        self.mock_db.execute_one.return_value = (0,)
+        self.mock_db.execute_query.return_value = []
+
+        self.faq_manager._get_all(status="public", tag="python")
+
+        count_query, count_params = self.mock_db.execute_one.call_args[0]
+        assert count_query == _LISTING_QUERIES[(True, False, True)][0]
+        assert count_params == ("public", "python")
+        list_query, list_params = self.mock_db.execute_query.call_args[0]
+        assert list_query == _LISTING_QUERIES[(True, False, True)][2]
+        assert list_params == ("public", "python", 0, -1)
+
+    def test_tag_filter_with_database(self, test_faq_manager):
+        """Test tag filtering and tag listing against a real database."""
+        first = test_faq_manager._create("Q1", "A1", tags=["python", "setup"])
+        test_faq_manager._create("Q2", "A2", tags=["java"])
+        test_faq_manager._create("Q3", "A3")
+
+        faqs, total = test_faq_manager._get_all(tag="python")
+        assert total == 1
+        assert [faq.id for faq in faqs] == [first.id]
+        assert test_faq_manager._get_all_tags() == ["java", "python", "setup"]
+
+        # Retagging and deleting keep faq_tags in sync
+        test_faq_manager._update(first.id, tags=["setup"])
+        assert test_faq_manager._get_all(tag="python")[1] == 0
+        test_faq_manager._delete(first.id)
+        assert test_faq_manager._get_all_tags() == ["java"]
 
     def test_row_to_faq(self):
         """Test converting database row to FAQResponse."""
@@ -644,7 +1045,3 @@ class TestFAQManager:
         assert result.tags == ["tag1"]
         assert result.created_at == "2024-01-01"
         assert result.updated_at == "2024-01-02"
-
-
-if __name__ == "__main__":
-    pytest.main([__file__])
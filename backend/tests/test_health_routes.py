@@ -2,7 +2,6 @@
 Tests for health routes functionality.
 """
 
-import pytest
 import json
 from datetime import datetime
 from fastapi.testclient import TestClient
@@ -96,7 +95,3 @@ class TestHealthRoutes:
 
         response = self.client.post("/health")
         assert response.status_code == 405
-
-
-if __name__ == "__main__":
-    pytest.main([__file__])
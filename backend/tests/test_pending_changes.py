@@ -132,6 +132,10 @@ class TestPendingChangesManager:
 
         shutil.rmtree(self.temp_dir, ignore_errors=True)
 
+    def _read_persisted(self):
+        """Read the pending changes back from disk as a new process would."""
+        return PendingChangesManager(cache_dir=self.temp_dir)._load_pending_changes()
+
     def test_initialization(self):
         """Test PendingChangesManager initialization."""
         assert self.manager.cache_dir == self.temp_dir
@@ -167,18 +171,17 @@ class TestPendingChangesManager:
         """Test adding a pending change."""
         self.manager.add_pending_change(1, ChangeType.CREATED, "public")
 
-        # Check file was created
-        assert os.path.exists(self.manager.pending_file)
+        # Check the change was logged
+        assert os.path.exists(self.manager.log_file)
 
         # Check content
-        with open(self.manager.pending_file, "r") as f:
-            data = json.load(f)
+        data = self._read_persisted()
 
-        assert "1" in data
-        assert data["1"]["faq_id"] == 1
-        assert data["1"]["change_type"] == "created"
-        assert data["1"]["original_status"] == "public"
-        assert "timestamp" in data["1"]
+        assert 1 in data
+        assert data[1]["faq_id"] == 1
+        assert data[1]["change_type"] == "created"
+        assert data[1]["original_status"] == "public"
+        assert "timestamp" in data[1]
 
     def test_add_pending_change_replaces_existing(self):
         """Test adding a pending change replaces existing one for same FAQ."""
@@ -189,12 +192,11 @@ class TestPendingChangesManager:
         self.manager.add_pending_change(1, ChangeType.UPDATED, "private")
 
         # Check only the second change exists
-        with open(self.manager.pending_file, "r") as f:
-            data = json.load(f)
+        data = self._read_persisted()
 
         assert len(data) == 1
-        assert data["1"]["change_type"] == "updated"
-        assert data["1"]["original_status"] == "private"
+        assert data[1]["change_type"] == "updated"
+        assert data[1]["original_status"] == "private"
 
     def test_add_pending_change_multiple_faqs(self):
         """Test adding pending changes for multiple FAQs."""
@@ -202,18 +204,38 @@ class TestPendingChangesManager:
         self.manager.add_pending_change(2, ChangeType.UPDATED)
         self.manager.add_pending_change(3, ChangeType.DELETED)
 
-        with open(self.manager.pending_file, "r") as f:
-            data = json.load(f)
+        data = self._read_persisted()
 
         assert len(data) == 3
-        assert "1" in data
-        assert "2" in data
-        assert "3" in data
+        assert 1 in data
+        assert 2 in data
+        assert 3 in data
+
+    def test_add_pending_changes_batch(self):
+        """Test adding several pending changes in one call."""
+        self.manager.add_pending_change(1, ChangeType.CREATED, "public")
+
+        with patch.object(
+            self.manager, "_append_log", wraps=self.manager._append_log
+        ) as mock_append:
+            self.manager.add_pending_changes(
+                [
+                    (1, ChangeType.UPDATED, "private"),
+                    (2, ChangeType.CREATED, "public"),
+                ]
+            )
+
+        mock_append.assert_called_once()
+        data = self._read_persisted()
+
+        assert len(data) == 2
+        assert data[1]["change_type"] == "updated"
+        assert data[2]["original_status"] == "public"
 
     def test_add_pending_change_exception_handling(self):
         """Test add_pending_change exception handling."""
         with patch.object(
-            self.manager, "_save_pending_changes", side_effect=Exception("Save error")
+            self.manager, "_append_log", side_effect=Exception("Save error")
         ):
             with pytest.raises(CacheError, match="Failed to add pending change"):
                 self.manager.add_pending_change(1, ChangeType.CREATED)
@@ -229,8 +251,7 @@ class TestPendingChangesManager:
         assert result is True
 
         # Check it's gone
-        with open(self.manager.pending_file, "r") as f:
-            data = json.load(f)
+        data = self._read_persisted()
 
         assert len(data) == 0
 
@@ -252,13 +273,12 @@ class TestPendingChangesManager:
         assert result is True
 
         # Check others remain
-        with open(self.manager.pending_file, "r") as f:
-            data = json.load(f)
+        data = self._read_persisted()
 
         assert len(data) == 2
-        assert "1" in data
-        assert "3" in data
-        assert "2" not in data
+        assert 1 in data
+        assert 3 in data
+        assert 2 not in data
 
     def test_remove_pending_change_exception_handling(self):
         """Test remove_pending_change exception handling."""
@@ -266,7 +286,7 @@ class TestPendingChangesManager:
         self.manager.add_pending_change(1, ChangeType.CREATED)
 
         with patch.object(
-            self.manager, "_save_pending_changes", side_effect=Exception("Save error")
+            self.manager, "_append_log", side_effect=Exception("Save error")
         ):
             with pytest.raises(CacheError, match="Failed to remove pending change"):
                 self.manager.remove_pending_change(1)
@@ -408,6 +428,68 @@ class TestPendingChangesManager:
             with pytest.raises(CacheError, match="Failed to clear pending changes"):
                 self.manager.clear_all_pending_changes()
 
+    def test_get_changes_for_rebuild_compacts_log(self):
+        """Test that the mutation log is folded into the snapshot for rebuild."""
+        self.manager.add_pending_change(1, ChangeType.CREATED, "public")
+        self.manager.add_pending_change(2, ChangeType.UPDATED, "private")
+        self.manager.remove_pending_change(1)
+
+        changes = self.manager.get_changes_for_rebuild()
+
+        assert [change.faq_id for change in changes] == [2]
+        assert not os.path.exists(self.manager.log_file)
+        with open(self.manager.pending_file, "r") as f:
+            assert list(json.load(f)) == ["2"]
+
+    def test_add_pending_change_compacts_large_log(self):
+        """Test that the log is folded into the snapshot once it grows too big."""
+        self.manager.add_pending_change(1, ChangeType.CREATED, "public")
+        assert os.path.exists(self.manager.log_file)
+
+        with patch("core.pending_changes._LOG_COMPACT_BYTES", 1):
+            self.manager.add_pending_change(2, ChangeType.UPDATED, "private")
+
+        assert not os.path.exists(self.manager.log_file)
+        with open(self.manager.pending_file, "r") as f:
+            assert list(json.load(f)) == ["1", "2"]
+        assert sorted(self.manager.get_pending_faq_ids()) == [1, 2]
+
+    def test_load_pending_changes_cached_until_files_change(self):
+        """Test that loads are served from memory until another writer appears."""
+        self.manager.add_pending_change(1, ChangeType.CREATED)
+
+        with patch.object(
+            self.manager,
+            "_read_pending_changes",
+            wraps=self.manager._read_pending_changes,
+        ) as mock_read:
+            assert list(self.manager._load_pending_changes()) == [1]
+            mock_read.assert_not_called()
+
+            # A second manager (e.g. another process) appends to the log
+            PendingChangesManager(cache_dir=self.temp_dir).add_pending_change(
+                2, ChangeType.UPDATED
+            )
+
+            assert sorted(self.manager._load_pending_changes()) == [1, 2]
+            mock_read.assert_called_once()
+
+    def test_load_pending_changes_skips_torn_log_line(self):
+        """Test that a partially written log record is ignored."""
+        self.manager.add_pending_change(1, ChangeType.CREATED)
+        with open(self.manager.log_file, "ab") as f:
+            f.write(b'{"op": "set", "chan')
+
+        assert list(self._read_persisted()) == [1]
+
+    def test_log_replay_keeps_change_order(self):
+        """Test that replaying the log keeps FAQs in the order they last changed."""
+        self.manager.add_pending_change(1, ChangeType.CREATED)
+        self.manager.add_pending_change(2, ChangeType.CREATED)
+        self.manager.add_pending_change(1, ChangeType.UPDATED)
+
+        assert list(self._read_persisted()) == [2, 1]
+
     def test_get_changes_for_rebuild_empty(self):
         """Test get_changes_for_rebuild with no changes."""
         result = self.manager.get_changes_for_rebuild()
@@ -482,7 +564,7 @@ class TestPendingChangesManager:
             json.dump(test_data, f)
 
         result = self.manager._load_pending_changes()
-        assert result == test_data
+        assert result == {1: test_data["1"]}
 
     def test_load_pending_changes_corrupted_file(self):
         """Test _load_pending_changes with corrupted file."""
@@ -508,7 +590,7 @@ class TestPendingChangesManager:
             }
         }
 
-        self.manager._save_pending_changes(test_data)
+        self.manager._save_pending_changes({1: test_data["1"]})
 
         # Check file was created with correct content
         assert os.path.exists(self.manager.pending_file)
@@ -548,7 +630,3 @@ class TestPendingChangesManager:
 
         result = self.manager.get_pending_faq_ids()
         assert large_id in result
-
-
-if __name__ == "__main__":
-    pytest.main([__file__])
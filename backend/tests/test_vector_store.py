@@ -10,7 +10,7 @@ import pickle
 import numpy as np
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
-from core.vector_store import VectorStore
+from core.vector_store import VectorStore, _configure_faiss_threads, _get_embedder
 from core.faq import FAQManager
 from core.exceptions import CacheError
 
@@ -29,6 +29,9 @@ class TestVectorStore:
         )
         self.mock_faq_manager = Mock(spec=FAQManager)
 
+        # Models are cached per process; start each test without one
+        _get_embedder.cache_clear()
+
     def teardown_method(self):
         """Clean up after each test."""
         # Clean up temp directory
@@ -60,6 +63,34 @@ class TestVectorStore:
             assert vector_store.cache_dir == mock_settings.rag_cache_dir
             assert vector_store.distance_metric == "l2"
 
+    @patch("core.vector_store.faiss.omp_set_num_threads")
+    def test_configure_faiss_threads(self, mock_set_threads):
+        """Test that the FAISS OpenMP thread count is pinned from settings."""
+        with patch("core.vector_store.settings") as mock_settings:
+            mock_settings.faiss_threads = 3
+            _configure_faiss_threads()
+
+        mock_set_threads.assert_called_once_with(3)
+
+    @patch("core.vector_store.os.cpu_count", return_value=8)
+    @patch("core.vector_store.faiss.omp_set_num_threads")
+    def test_configure_faiss_threads_defaults_to_cpu_count(
+        self, mock_set_threads, mock_cpu_count
+    ):
+        """Test FAISS uses every CPU when no thread count is configured."""
+        with patch("core.vector_store.settings") as mock_settings:
+            mock_settings.faiss_threads = 0
+            _configure_faiss_threads()
+
+        mock_set_threads.assert_called_once_with(8)
+
+    @patch("core.vector_store.faiss.omp_set_num_threads")
+    def test_initialization_leaves_faiss_threads_alone(self, mock_set_threads):
+        """Test that creating a store does not reset the process-wide setting."""
+        VectorStore(cache_dir=self.temp_dir)
+
+        mock_set_threads.assert_not_called()
+
     def test_is_ready_false_initially(self):
         """Test is_ready returns False initially."""
         assert self.vector_store.is_ready() is False
@@ -87,12 +118,40 @@ class TestVectorStore:
         assert self.vector_store.embedder == mock_embedder
         mock_sentence_transformer.assert_called_once_with("all-MiniLM-L6-v2")
 
+    @patch("core.vector_store.SentenceTransformer")
+    def test_embedder_shared_between_instances(self, mock_sentence_transformer):
+        """Test that stores using the same model share one loaded embedder."""
+        other_store = VectorStore(
+            model_name="all-MiniLM-L6-v2", cache_dir=self.temp_dir
+        )
+
+        self.vector_store._initialize_embedder()
+        other_store._initialize_embedder()
+
+        assert other_store.embedder is self.vector_store.embedder
+        mock_sentence_transformer.assert_called_once_with("all-MiniLM-L6-v2")
+
+    @patch("core.vector_store.torch.set_num_threads")
+    @patch("core.vector_store.SentenceTransformer")
+    @patch("core.vector_store.settings")
+    def test_embedder_pins_torch_threads(
+        self, mock_settings, mock_sentence_transformer, mock_set_threads
+    ):
+        """Test that a configured embedder thread count is applied before loading."""
+        mock_settings.embedder_threads = 1
+
+        self.vector_store._initialize_embedder()
+
+        mock_set_threads.assert_called_once_with(1)
+
     def test_get_cache_paths(self):
         """Test cache paths generation."""
         paths = self.vector_store._get_cache_paths()
 
         expected_paths = {
-            "documents": os.path.join(self.temp_dir, "documents.pkl"),
+            "documents": os.path.join(self.temp_dir, "documents.jsonl"),
+            "legacy_documents": os.path.join(self.temp_dir, "documents.pkl"),
+            "document_texts": os.path.join(self.temp_dir, "document_texts.jsonl"),
             "embeddings": os.path.join(self.temp_dir, "embeddings.npy"),
             "faiss_index": os.path.join(self.temp_dir, "faiss_index.bin"),
             "metadata": os.path.join(self.temp_dir, "metadata.json"),
@@ -143,7 +202,9 @@ class TestVectorStore:
         assert self.vector_store.documents == documents
         assert self.vector_store.document_texts == texts
         mock_faiss.IndexFlatIP.assert_called_once_with(3)  # dimension
-        mock_faiss.normalize_L2.assert_called_once()
+        # Cosine embeddings are normalized by the model, not a second pass
+        assert mock_embedder.encode.call_args.kwargs["normalize_embeddings"] is True
+        mock_faiss.normalize_L2.assert_not_called()
         mock_index.add.assert_called_once()
 
     @patch("core.vector_store.faiss")
@@ -169,6 +230,91 @@ class TestVectorStore:
         assert result is True
         mock_faiss.IndexFlatL2.assert_called_once_with(3)  # dimension
         mock_faiss.normalize_L2.assert_not_called()  # No normalization for L2
+        assert mock_embedder.encode.call_args.kwargs["normalize_embeddings"] is False
+
+    @patch("core.vector_store.settings")
+    @patch("core.vector_store.faiss")
+    @patch("core.vector_store.SentenceTransformer")
+    def test_build_index_encodes_in_configured_batches(
+        self, mock_sentence_transformer, mock_faiss, mock_settings
+    ):
+        """Test that rebuilds encode with the configured batch size."""
+        mock_settings.embed_batch_size = 64
+        mock_settings.ann_threshold = 500
+        mock_settings.embedder_threads = 0
+        mock_embedder = Mock()
+        mock_embedder.encode.return_value = np.ones((1, 3), dtype=np.float32)
+        mock_sentence_transformer.return_value = mock_embedder
+
+        self.vector_store._build_index(
+            [{"id": 1, "question": "Q1", "answer": "A1"}], ["passage: Q: Q1\nA: A1"]
+        )
+
+        kwargs = mock_embedder.encode.call_args.kwargs
+        assert kwargs["batch_size"] == 64
+        assert kwargs["convert_to_numpy"] is True
+        assert kwargs["show_progress_bar"] is False
+
+    @patch("core.vector_store.settings")
+    @patch("core.vector_store.SentenceTransformer")
+    def test_build_index_hnsw_above_threshold(
+        self, mock_sentence_transformer, mock_settings
+    ):
+        """Test that large corpora get an HNSW index searched with a wider beam."""
+        mock_settings.ann_threshold = 2
+        mock_settings.vector_quantization = "none"
+        mock_settings.embedder_threads = 0
+
+        rng = np.random.default_rng(0)
+        mock_embeddings = rng.random((4, 8), dtype=np.float32)
+        # The model returns unit vectors for cosine similarity
+        mock_embeddings /= np.linalg.norm(mock_embeddings, axis=1, keepdims=True)
+        mock_embedder = Mock()
+        mock_embedder.encode.side_effect = [mock_embeddings, mock_embeddings[:1]]
+        mock_sentence_transformer.return_value = mock_embedder
+
+        documents = [{"id": i, "question": f"Q{i}", "answer": "A"} for i in range(4)]
+        texts = [f"passage: Q: Q{i}\nA: A" for i in range(4)]
+
+        with patch.object(self.vector_store, "_save_to_cache"):
+            self.vector_store._build_index(documents, texts)
+
+        assert self.vector_store.index_type == "hnsw"
+        assert self.vector_store.index.ntotal == 4
+
+        results = self.vector_store.search_similar("Q0", top_k=2)
+
+        assert self.vector_store.index.hnsw.efSearch == 32
+        assert results[0]["id"] == 0
+
+    @patch("core.vector_store.settings")
+    @patch("core.vector_store.SentenceTransformer")
+    def test_build_index_hnsw_sq8(self, mock_sentence_transformer, mock_settings):
+        """Test that large corpora can be stored as 8-bit quantized vectors."""
+        mock_settings.ann_threshold = 2
+        mock_settings.vector_quantization = "sq8"
+        mock_settings.embedder_threads = 0
+
+        rng = np.random.default_rng(0)
+        mock_embeddings = rng.random((300, 8), dtype=np.float32)
+        # The model returns unit vectors for cosine similarity
+        mock_embeddings /= np.linalg.norm(mock_embeddings, axis=1, keepdims=True)
+        mock_embedder = Mock()
+        mock_embedder.encode.side_effect = [mock_embeddings, mock_embeddings[5:6]]
+        mock_sentence_transformer.return_value = mock_embedder
+
+        documents = [{"id": i, "question": f"Q{i}", "answer": "A"} for i in range(300)]
+        texts = [f"passage: Q: Q{i}\nA: A" for i in range(300)]
+
+        with patch.object(self.vector_store, "_save_to_cache"):
+            self.vector_store._build_index(documents, texts)
+
+        assert self.vector_store.index_type == "hnsw"
+        assert self.vector_store.quantization == "sq8"
+        assert self.vector_store.index.is_trained
+
+        results = self.vector_store.search_similar("Q5", top_k=1)
+        assert results[0]["id"] == 5
 
     def test_search_similar_faqs_not_ready(self):
         """Test search_similar_faqs when not ready."""
@@ -183,6 +329,7 @@ class TestVectorStore:
     ):
         """Test successful search_similar_faqs."""
         mock_settings.default_top_k = 3
+        mock_settings.embedder_threads = 0
 
         # Setup vector store as ready
         self.vector_store._initialized = True
@@ -192,23 +339,27 @@ class TestVectorStore:
 
         # Setup embedder
         mock_embedder = Mock()
-        mock_embedder.encode.return_value = np.array([[1.0, 2.0]], dtype=np.float32)
+        mock_embedder.encode.return_value = np.array(
+            [[1.0, 2.0], [3.0, 4.0]], dtype=np.float32
+        )
         mock_sentence_transformer.return_value = mock_embedder
 
-        # Setup search results
+        # Setup search results (one row per query formulation)
         mock_index.search.return_value = (
-            np.array([[0.9, 0.8, 0.7]]),  # scores
-            np.array([[0, 1, 2]]),  # indices
+            np.array([[0.9, 0.8, 0.7], [0.9, 0.8, 0.7]]),  # scores
+            np.array([[0, 2, -1], [2, 1, 0]]),  # indices
         )
 
         result = self.vector_store.search_similar_faqs("test query")
 
-        # Should combine results from both queries
-        expected = "text1\n\ntext2\n\ntext3\n\ntext1\n\ntext2\n\ntext3"
-        assert result == expected
+        # Should combine results from both queries without repeating FAQs
+        assert result == "text1\n\ntext3\n\ntext2"
 
-        # Should call encode twice (dual query strategy)
-        assert mock_embedder.encode.call_count == 2
+        # Both query formulations are embedded and searched as one batch
+        mock_embedder.encode.assert_called_once()
+        assert len(mock_embedder.encode.call_args[0][0]) == 2
+        mock_index.search.assert_called_once()
+        assert mock_index.search.call_args[0][0].shape == (2, 2)
 
     def test_search_similar_not_built(self):
         """Test search_similar when index not built."""
@@ -331,15 +482,17 @@ class TestVectorStore:
         for path in cache_paths.values():
             assert not os.path.exists(path)
 
-    @patch("core.vector_store.pickle")
     @patch("core.vector_store.np")
     @patch("core.vector_store.faiss")
-    def test_save_to_cache(self, mock_faiss, mock_np, mock_pickle):
+    def test_save_to_cache(self, mock_faiss, mock_np):
         """Test saving data to cache."""
         # Setup test data
         self.vector_store.documents = [{"id": 1, "question": "Q1"}]
         mock_embeddings = np.array([[1.0, 2.0, 3.0]], dtype=np.float32)
         self.vector_store.index = Mock()
+        mock_faiss.write_index.side_effect = lambda index, path: open(
+            path, "wb"
+        ).close()
 
         # Mock datetime for consistent testing
         with patch("core.vector_store.np.datetime64") as mock_datetime:
@@ -350,7 +503,8 @@ class TestVectorStore:
         assert result is True
 
         # Check that files were written
-        mock_pickle.dump.assert_called_once()
+        with open(os.path.join(self.temp_dir, "documents.jsonl"), "r") as f:
+            assert [json.loads(line) for line in f] == [{"id": 1, "question": "Q1"}]
         mock_np.save.assert_called_once()
         mock_faiss.write_index.assert_called_once()
 
@@ -364,6 +518,56 @@ class TestVectorStore:
         assert metadata["model_name"] == "all-MiniLM-L6-v2"
         assert metadata["document_count"] == 1
         assert metadata["distance_metric"] == "cosine"
+        assert metadata["index_type"] == "flat"
+        assert metadata["quantization"] == "none"
+        assert metadata["cache_version"] == "2.0"
+        assert not any(name.endswith(".tmp") for name in os.listdir(self.temp_dir))
+
+    @patch("core.vector_store.faiss")
+    def test_save_to_cache_failure_keeps_previous_cache(self, mock_faiss):
+        """Test that a failed save leaves the existing cache files untouched."""
+        cache_paths = self.vector_store._get_cache_paths()
+        with open(cache_paths["metadata"], "w") as f:
+            f.write('{"model_name": "old"}')
+        self.vector_store.documents = [{"id": 1, "question": "Q1"}]
+        self.vector_store.index = Mock()
+        mock_faiss.write_index.side_effect = RuntimeError("disk full")
+
+        result = self.vector_store._save_to_cache(np.ones((1, 3), dtype=np.float32))
+
+        assert result is False
+        assert not os.path.exists(cache_paths["documents"])
+        with open(cache_paths["metadata"], "r") as f:
+            assert json.load(f) == {"model_name": "old"}
+        assert not any(name.endswith(".tmp") for name in os.listdir(self.temp_dir))
+
+    @patch("core.vector_store.SentenceTransformer")
+    def test_load_from_cache_memory_maps_index(self, mock_sentence_transformer):
+        """Test that a saved index is searchable after a memory-mapped load."""
+        embeddings = np.eye(4, dtype=np.float32)
+        mock_embedder = Mock()
+        mock_embedder.encode.return_value = embeddings
+        mock_sentence_transformer.return_value = mock_embedder
+
+        documents = [{"id": i, "question": f"Q{i}", "answer": "A"} for i in range(4)]
+        texts = self.vector_store._format_faq_texts(documents)
+        self.vector_store._build_index(documents, texts)
+
+        loaded = VectorStore(
+            model_name="all-MiniLM-L6-v2",
+            cache_dir=self.temp_dir,
+            distance_metric="cosine",
+        )
+        with patch.object(loaded, "_format_faq_texts") as mock_format:
+            assert loaded._load_from_cache() is True
+
+        # Passages are read back as saved, not reformatted
+        mock_format.assert_not_called()
+        assert loaded.document_texts == texts
+
+        mock_embedder.encode.return_value = embeddings[2:3]
+        results = loaded.search_similar("Q2", top_k=1)
+        assert results[0]["id"] == 2
 
     def test_load_from_cache_missing_files(self):
         """Test loading from cache when files are missing."""
@@ -394,9 +598,8 @@ class TestVectorStore:
         result = self.vector_store._load_from_cache()
         assert result is False
 
-    @patch("core.vector_store.pickle")
     @patch("core.vector_store.faiss")
-    def test_load_from_cache_success(self, mock_faiss, mock_pickle):
+    def test_load_from_cache_success(self, mock_faiss):
         """Test successful loading from cache."""
         # Create metadata
         metadata = {
@@ -404,6 +607,7 @@ class TestVectorStore:
             "document_count": 1,
             "embedding_dimension": 384,
             "distance_metric": "cosine",
+            "index_type": "hnsw",
         }
 
         metadata_path = os.path.join(self.temp_dir, "metadata.json")
@@ -412,14 +616,15 @@ class TestVectorStore:
 
         # Create other required files
         cache_paths = self.vector_store._get_cache_paths()
-        for key, path in cache_paths.items():
-            if key != "metadata":
-                with open(path, "w") as f:
-                    f.write("dummy data")
+        for key in ("embeddings", "faiss_index"):
+            with open(cache_paths[key], "w") as f:
+                f.write("dummy data")
 
-        # Setup mocks
         mock_documents = [{"question": "Q1", "answer": "A1"}]
-        mock_pickle.load.return_value = mock_documents
+        with open(cache_paths["documents"], "w") as f:
+            f.write(json.dumps(mock_documents[0]) + "\n")
+
+        # Setup mocks
         mock_index = Mock()
         mock_faiss.read_index.return_value = mock_index
 
@@ -428,8 +633,63 @@ class TestVectorStore:
         assert result is True
         assert self.vector_store.documents == mock_documents
         assert self.vector_store.index == mock_index
+        assert self.vector_store.index_type == "hnsw"
+        mock_faiss.read_index.assert_called_once_with(
+            cache_paths["faiss_index"],
+            mock_faiss.IO_FLAG_MMAP_IFC | mock_faiss.IO_FLAG_READ_ONLY,
+        )
         assert self.vector_store.document_texts == ["passage: Q: Q1\nA: A1"]
 
+    @patch("core.vector_store.faiss")
+    def test_load_from_cache_migrates_pickled_documents(self, mock_faiss):
+        """Test that a version 1.0 pickle cache is read once and rewritten."""
+        metadata = {"model_name": "all-MiniLM-L6-v2", "embedding_dimension": 384}
+        cache_paths = self.vector_store._get_cache_paths()
+        with open(cache_paths["metadata"], "w") as f:
+            json.dump(metadata, f)
+        for key in ("embeddings", "faiss_index"):
+            with open(cache_paths[key], "w") as f:
+                f.write("dummy data")
+
+        documents = [{"id": 1, "question": "Q1", "answer": "A1", "tags": []}]
+        with open(cache_paths["legacy_documents"], "wb") as f:
+            pickle.dump(documents, f)
+
+        assert self.vector_store._load_from_cache() is True
+
+        assert self.vector_store.documents == documents
+        assert not os.path.exists(cache_paths["legacy_documents"])
+        with open(cache_paths["documents"], "r") as f:
+            assert [json.loads(line) for line in f] == documents
+        assert not os.path.exists(f"{cache_paths['documents']}.tmp")
+
+    @patch("core.vector_store.faiss")
+    def test_load_from_cache_keeps_pickle_when_migration_fails(self, mock_faiss):
+        """Test that an interrupted migration leaves no partial documents.jsonl."""
+        metadata = {"model_name": "all-MiniLM-L6-v2", "embedding_dimension": 384}
+        cache_paths = self.vector_store._get_cache_paths()
+        with open(cache_paths["metadata"], "w") as f:
+            json.dump(metadata, f)
+        for key in ("embeddings", "faiss_index"):
+            with open(cache_paths[key], "w") as f:
+                f.write("dummy data")
+        with open(cache_paths["legacy_documents"], "wb") as f:
+            pickle.dump([{"id": 1, "question": "Q1", "answer": "A1"}], f)
+
+        def write_partially(path):
+            with open(path, "w") as f:
+                f.write('{"id": 1, "quest')
+            raise OSError("disk full")
+
+        with patch.object(
+            self.vector_store, "_write_documents", side_effect=write_partially
+        ):
+            assert self.vector_store._load_from_cache() is False
+
+        assert not os.path.exists(cache_paths["documents"])
+        assert not os.path.exists(f"{cache_paths['documents']}.tmp")
+        assert os.path.exists(cache_paths["legacy_documents"])
+
     def test_initialize_success(self):
         """Test successful initialization."""
         self.mock_faq_manager.load_faqs_for_rag.return_value = [
@@ -472,24 +732,29 @@ class TestVectorStore:
             result = self.vector_store._build_index_from_service(self.mock_faq_manager)
 
         assert result is True
-        # Should not call load_faqs_for_rag when cache exists
-        self.mock_faq_manager.load_faqs_for_rag.assert_not_called()
+        # Should not read FAQs when cache exists
+        self.mock_faq_manager.iter_faqs_for_rag.assert_not_called()
 
     def test_build_index_from_service_force_rebuild(self):
         """Test building index with force rebuild."""
-        self.mock_faq_manager.load_faqs_for_rag.return_value = [
-            {"question": "Q1", "answer": "A1"}
-        ]
+        self.mock_faq_manager.iter_faqs_for_rag.return_value = iter(
+            [{"question": "Q1", "answer": "A1"}]
+        )
 
         with patch.object(self.vector_store, "_load_from_cache", return_value=True):
-            with patch.object(self.vector_store, "_build_index", return_value=True):
+            with patch.object(
+                self.vector_store, "_build_index", return_value=True
+            ) as mock_build:
                 result = self.vector_store._build_index_from_service(
                     self.mock_faq_manager, force_rebuild=True
                 )
 
         assert result is True
-        # Should call load_faqs_for_rag even when cache exists due to force rebuild
-        self.mock_faq_manager.load_faqs_for_rag.assert_called_once()
+        # Should read FAQs even when cache exists due to force rebuild
+        self.mock_faq_manager.iter_faqs_for_rag.assert_called_once()
+        mock_build.assert_called_once_with(
+            [{"question": "Q1", "answer": "A1"}], ["passage: Q: Q1\nA: A1"]
+        )
 
     def test_rebuild_cache_success(self):
         """Test successful cache rebuild."""
@@ -523,7 +788,3 @@ class TestVectorStore:
             with patch.object(self.vector_store, "_clear_cache"):
                 with pytest.raises(CacheError, match="Failed to rebuild index"):
                     self.vector_store.rebuild_cache(self.mock_faq_manager)
-
-
-if __name__ == "__main__":
-    pytest.main([__file__])